@@ -1,4 +1,5 @@
 import os
+import shutil
 import subprocess
 import sys
 from pathlib import Path
@@ -9,51 +10,52 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def get_scripts_dir(venv_path):
+    """Return the directory holding the virtual environment's executables."""
+    return venv_path / ("Scripts" if platform.system() == "Windows" else "bin")
+
 def create_virtual_environment(venv_path):
-    """Create a virtual environment."""
+    """Create a virtual environment with an up-to-date pip."""
     try:
-        subprocess.run([sys.executable, "-m", "venv", str(venv_path)], check=True)
+        # upgrade_deps is only available on Python 3.9+
+        upgrade_deps = sys.version_info >= (3, 9)
+        builder = venv.EnvBuilder(with_pip=True, upgrade_deps=True) if upgrade_deps else venv.EnvBuilder(with_pip=True)
+        builder.create(str(venv_path))
         logger.info(f"Created virtual environment at {venv_path}")
         
-        # Get pip path
-        pip_path = venv_path / "bin" / "pip"
-        
-        # Upgrade pip
-        logger.info("Upgrading pip...")
-        subprocess.run([str(pip_path), "install", "--upgrade", "pip"], check=True)
-    except subprocess.CalledProcessError as e:
+        if not upgrade_deps:
+            # Upgrade pip
+            logger.info("Upgrading pip...")
+            pip_path = get_scripts_dir(venv_path) / "pip"
+            subprocess.run([str(pip_path), "install", "--upgrade", "pip"], check=True)
+    except (OSError, subprocess.CalledProcessError) as e:
         logger.error(f"Failed to create virtual environment: {e}")
         raise
 
 def install_dependencies(venv_path):
     """Install project dependencies."""
     try:
-        pip_path = venv_path / "bin" / "pip"
+        scripts_dir = get_scripts_dir(venv_path)
+        pip_path = scripts_dir / "pip"
+        python_path = scripts_dir / "python"
         
-        # Install core dependencies first
-        logger.info("Installing core dependencies...")
-        subprocess.run([
-            str(pip_path), "install", "-e", "."
-        ], check=True)
+        # Skip pip's version check and prompts in every subprocess
+        env = dict(os.environ, PIP_DISABLE_PIP_VERSION_CHECK="1", PIP_NO_INPUT="1")
         
-        # Install dev dependencies separately
-        logger.info("Installing development dependencies...")
-        subprocess.run([
-            str(pip_path), "install", 
-            "pytest==8.3.4",
-            "pytest-mockito==0.0.4",
-            "black==24.2.0",
-            "isort==5.13.0",
-            "flake8==7.0.0"
-        ], check=True)
+        # Install core, development and Playwright dependencies in a single resolver pass,
+        # using uv when it is available
+        uv_path = shutil.which("uv")
+        if uv_path:
+            install_cmd = [uv_path, "pip", "install", "--python", str(python_path)]
+        else:
+            install_cmd = [str(pip_path), "install"]
+        logger.info("Installing project and development dependencies...")
+        subprocess.run(install_cmd + ["-e", ".[dev]", "playwright"], check=True, env=env)
         
-        # Install playwright
-        logger.info("Installing and setting up Playwright...")
-        subprocess.run([
-            str(pip_path), "install", "playwright"
-        ], check=True)
-        playwright_path = venv_path / "bin" / "playwright"
-        subprocess.run([str(playwright_path), "install"], check=True)
+        # Install playwright browsers
+        logger.info("Setting up Playwright...")
+        playwright_path = scripts_dir / "playwright"
+        subprocess.run([str(playwright_path), "install"], check=True, env=env)
         
     except subprocess.CalledProcessError as e:
         logger.error(f"Failed to install dependencies: {e}")
@@ -95,7 +97,10 @@ def main():
         logger.info("\nNext steps:")
         logger.info("1. Update the .env file with your API keys")
         logger.info("2. Activate the virtual environment:")
-        logger.info("   source .venv/bin/activate")
+        if platform.system() == "Windows":
+            logger.info("   .venv\\Scripts\\activate")
+        else:
+            logger.info("   source .venv/bin/activate")
         logger.info("3. Run the application: python -m streamlit run src/crawlgpt/ui/chat_app.py")
 
     except Exception as e:
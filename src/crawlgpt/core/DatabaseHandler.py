@@ -1,29 +1,221 @@
 from sentence_transformers import SentenceTransformer
 import faiss
+import torch
 import numpy as np
-from typing import List, Dict
+import orjson
+import logging
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Opt-in CPU thread tuning for encoding; left alone by default so the host's
+# torch settings are not overridden. "auto" uses half of the available cores.
+_cpu_threads = os.getenv("EMBEDDING_CPU_THREADS")
+if _cpu_threads:
+    torch.set_num_threads(
+        max(1, (os.cpu_count() or 2) // 2) if _cpu_threads == "auto" else int(_cpu_threads)
+    )
+
+# Process-wide LRU of embeddings keyed by content hash, so repeated chunks
+# (boilerplate, re-crawls, other users' sessions) are encoded only once
+EMBEDDING_CACHE_SIZE = 10_000
+_embedding_cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+_embedding_cache_lock = threading.Lock()
+
+# int8 dynamically quantized export shipped with the sentence-transformers ONNX models
+DEFAULT_ONNX_FILE = "onnx/model_qint8_avx2.onnx"
+
+
+@lru_cache(maxsize=4)
+def load_embedding_model(embedding_model_name: str, backend: str = "torch",
+                         onnx_file_name: str = DEFAULT_ONNX_FILE,
+                         device: Optional[str] = None) -> SentenceTransformer:
+    """
+    Loads a SentenceTransformer embedding model.
+    Models are cached per argument set, so every VectorDatabase (e.g. one per
+    user session) shares the same weights; encode() is safe to call concurrently.
+    With backend="onnx" the quantized int8 ONNX export is run through onnxruntime
+    (requires the optional ``onnx`` extra); if it cannot be loaded, the regular
+    PyTorch model is used instead.
+    Args:
+        embedding_model_name (str): SentenceTransformer model name or path.
+        backend (str): "torch" or "onnx".
+        onnx_file_name (str): ONNX file inside the model repository to load.
+        device (Optional[str]): Device for the PyTorch model; defaults to CUDA when available.
+    Returns:
+        SentenceTransformer: The loaded model.
+    """
+    if backend == "onnx":
+        try:
+            return SentenceTransformer(
+                embedding_model_name,
+                backend="onnx",
+                model_kwargs={"file_name": onnx_file_name}
+            )
+        except Exception as e:
+            logger.warning(f"ONNX embedding model unavailable, falling back to PyTorch: {str(e)}")
+
+    device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+    model = SentenceTransformer(embedding_model_name, device=device)
+    if device == "cuda":
+        model.half()
+    return model
 
 
 class VectorDatabase:
-    def __init__(self, embedding_model_name: str = "all-MiniLM-L6-v2", dim: int = 384):
+    """
+    FAISS-backed store of text chunks, their summaries and embeddings.
+
+    Embedding performance knobs:
+        - On a CUDA device the encoder runs in half precision.
+        - On CPU, set EMBEDDING_CPU_THREADS (a number, or "auto" for half the cores)
+          to tune torch's intra-op threads used while encoding.
+        - EMBEDDING_BACKEND=onnx runs the int8 quantized ONNX encoder instead.
+    """
+    def __init__(self, embedding_model_name: str = "all-MiniLM-L6-v2", dim: int = 384, batch_size: int = 64,
+                 hnsw_m: int = 32, ef_construction: int = 200, backend: Optional[str] = None,
+                 device: Optional[str] = None):
         """
         VectorDatabase: A simple vector database for storing and retrieving contextual embeddings.
+        Args:
+            embedding_model_name (str): SentenceTransformer model used for embeddings.
+            dim (int): Dimension of the embedding vectors.
+            batch_size (int): Number of texts encoded per forward pass.
+            hnsw_m (int): Number of neighbors per node in the HNSW graph.
+            ef_construction (int): Candidate list size used while building the HNSW graph.
+            backend (Optional[str]): Embedding backend, "torch" or "onnx" (int8 quantized).
+                Defaults to the EMBEDDING_BACKEND environment variable, else "torch".
+            device (Optional[str]): Device for the encoder; defaults to CUDA when available.
         """
-        self.model = SentenceTransformer(embedding_model_name)
-        self.index = faiss.IndexFlatL2(dim)
-        self.data = []  # Stores raw data (context and summaries)
+        backend = backend or os.getenv("EMBEDDING_BACKEND", "torch")
+        self.model = load_embedding_model(embedding_model_name, backend, device=device)
+        self.model_key = f"{embedding_model_name}:{backend}".encode()
+        self.batch_size = batch_size
+        # HNSW gives sub-linear approximate search instead of a full scan per query;
+        # embeddings are normalized, so inner product ranks like L2 with one dot product
+        self.index = faiss.IndexHNSWFlat(dim, hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        self.index.hnsw.efConstruction = ef_construction
+        # Raw data kept as parallel lists aligned with the index ids
+        self.texts: List[str] = []
+        self.summaries: List[str] = []
+        self._stored_texts = set()
+        # Serialized state from to_dict, reused until the stored data changes
+        self._dict_cache: Optional[Dict] = None
+
+    def __len__(self) -> int:
+        """Number of stored records."""
+        return len(self.texts)
 
-    def add_data(self, texts: List[str], summaries: List[str]) -> None:
+    def is_empty(self) -> bool:
+        """Whether no records are stored; O(1), unlike serializing with to_dict."""
+        return not self.texts
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Encodes texts into normalized float32 embeddings.
+        Embeddings are served from a process-wide cache keyed by content hash;
+        only unique, uncached texts go through the model.
+        Args:
+            texts (List[str]): The texts to encode.
+        Returns:
+            np.ndarray: Embeddings of shape (len(texts), dim) in input order.
+        """
+        keys = [hashlib.blake2b(self.model_key + text.encode(), digest_size=16).digest() for text in texts]
+        embeddings = np.empty((len(texts), self.index.d), dtype="float32")
+        missing = {}  # key -> positions still to encode
+        with _embedding_cache_lock:
+            for i, key in enumerate(keys):
+                cached = _embedding_cache.get(key)
+                if cached is not None:
+                    _embedding_cache.move_to_end(key)
+                    embeddings[i] = cached
+                else:
+                    missing.setdefault(key, []).append(i)
+
+        if missing:
+            positions = list(missing.values())
+            encoded = self._encode_batch([texts[p[0]] for p in positions])
+            with _embedding_cache_lock:
+                for key, p, embedding in zip(missing, positions, encoded):
+                    embeddings[p] = embedding
+                    _embedding_cache[key] = embedding.copy()
+                while len(_embedding_cache) > EMBEDDING_CACHE_SIZE:
+                    _embedding_cache.popitem(last=False)
+        return embeddings
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        """
+        Runs the embedding model over texts.
+        Texts are sorted by length before encoding so each batch holds similarly
+        sized inputs (less padding), and the original order is restored afterwards.
+        Args:
+            texts (List[str]): The texts to encode.
+        Returns:
+            np.ndarray: Embeddings of shape (len(texts), dim) in input order.
+        """
+        order = np.argsort([len(text) for text in texts], kind="stable")
+        embeddings = self.model.encode(
+            [texts[i] for i in order],
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        )
+        return np.ascontiguousarray(embeddings[np.argsort(order)], dtype="float32")
+
+    def add_data(self, texts: List[str], summaries: List[str],
+                 embeddings: Optional[np.ndarray] = None) -> None:
         """
         Adds data to the vector database.
+        Texts that are already stored (or repeated within the batch) are skipped.
         Args:
             texts (List[str]): The original texts to be stored.
             summaries (List[str]): Summarized versions of the texts.
+            embeddings (Optional[np.ndarray]): Normalized embeddings aligned with texts,
+                e.g. previously persisted ones; the texts are encoded when omitted.
         """
-        embeddings = self.model.encode(texts)
-        self.index.add(np.array(embeddings).astype("float32"))
-        for text, summary in zip(texts, summaries):
-            self.data.append({"text": text, "summary": summary})
+        new_texts, new_summaries, positions = [], [], []
+        for i, (text, summary) in enumerate(zip(texts, summaries)):
+            if text not in self._stored_texts:
+                self._stored_texts.add(text)
+                new_texts.append(text)
+                new_summaries.append(summary)
+                positions.append(i)
+        if not new_texts:
+            return
+        if embeddings is None:
+            self.index.add(self.encode(new_texts))
+        else:
+            self.index.add(np.ascontiguousarray(embeddings[positions], dtype="float32"))
+        self.texts.extend(new_texts)
+        self.summaries.extend(new_summaries)
+        self._dict_cache = None
+
+    def records_since(self, start: int) -> Tuple[List[str], List[str], np.ndarray]:
+        """
+        Returns the records added after the first ``start`` ones, e.g. to persist
+        what a single extraction stored.
+        Args:
+            start (int): Number of records to skip, as returned by len() beforehand.
+        Returns:
+            Tuple[List[str], List[str], np.ndarray]: Texts, summaries and embeddings.
+        """
+        count = self.index.ntotal - start
+        embeddings = (self.index.reconstruct_n(start, count) if count > 0
+                      else np.empty((0, self.index.d), dtype="float32"))
+        return self.texts[start:], self.summaries[start:], embeddings
+
+    @property
+    def data(self) -> List[Dict]:
+        """
+        Stored context and summaries as a list of {"text", "summary"} records.
+        """
+        return [{"text": text, "summary": summary} for text, summary in zip(self.texts, self.summaries)]
 
     def search(self, query: str, top_k: int = 5) -> List[Dict]:
         """
@@ -34,26 +226,96 @@ class VectorDatabase:
         Returns:
             List[Dict]: List of matched context and summaries.
         """
-        query_embedding = self.model.encode([query])
-        distances, indices = self.index.search(np.array(query_embedding).astype("float32"), top_k)
-        results = [self.data[i] for i in indices[0] if i < len(self.data)]
-        return results
+        return self.search_by_embedding(self.encode([query]), top_k)
+
+    def search_by_embedding(self, query_embedding: np.ndarray, top_k: int = 5) -> List[Dict]:
+        """
+        Searches the vector database using an already encoded query.
+        Args:
+            query_embedding (np.ndarray): Query embedding of shape (1, dim), as returned by encode.
+            top_k (int): Number of results to return.
+        Returns:
+            List[Dict]: List of matched context and summaries.
+        """
+        self.index.hnsw.efSearch = max(16, 4 * top_k)
+        distances, indices = self.index.search(query_embedding, top_k)
+        # faiss pads missing neighbors with -1
+        return [
+            {"text": self.texts[i], "summary": self.summaries[i]}
+            for i in indices[0] if 0 <= i < len(self.texts)
+        ]
 
     def to_dict(self) -> Dict:
         """
         Converts the internal state of the vector database to a dictionary format.
+        The result is cached until data is added or restored, so callers must not modify it.
         """
-        return {
-            "data": self.data,
-            "index": self.index.reconstruct_n(0, self.index.ntotal).tolist()
-        }
+        if self._dict_cache is None:
+            self._dict_cache = {
+                "data": self.data,
+                "index": self.index.reconstruct_n(0, self.index.ntotal).tolist()
+            }
+        return self._dict_cache
+
+    def iter_embeddings(self, batch_size: int = 1024) -> Iterator[np.ndarray]:
+        """
+        Yields the stored embeddings in insertion order, one block of rows at a time,
+        so a large index can be serialized without reconstructing it all at once.
+        Args:
+            batch_size (int): Maximum number of embeddings per block.
+        """
+        total = self.index.ntotal
+        for start in range(0, total, batch_size):
+            yield self.index.reconstruct_n(start, min(batch_size, total - start))
 
     def from_dict(self, state: Dict) -> None:
         """
         Restores the internal state of the vector database from a dictionary format.
         Args:
             state (Dict): The state to restore.
+        Raises:
+            ValueError: If the embeddings don't match the records or the index dimension.
+        """
+        # One writable float32 copy; normalize_L2 works in place
+        embeddings = np.array(state["index"], dtype="float32")
+        if (state["data"] or embeddings.size) and embeddings.shape != (len(state["data"]), self.index.d):
+            raise ValueError(
+                f"Expected embeddings of shape ({len(state['data'])}, {self.index.d}), got {embeddings.shape}"
+            )
+        self.texts = [item["text"] for item in state["data"]]
+        self.summaries = [item["summary"] for item in state["data"]]
+        self._stored_texts = set(self.texts)
+        self._dict_cache = None
+        self.index.reset()
+        if embeddings.size:
+            # Backups made before embeddings were normalized need it for inner product search
+            faiss.normalize_L2(embeddings)
+            self.index.add(embeddings)
+
+    def save(self, path: str) -> None:
+        """
+        Saves the vector database to disk using faiss native serialization.
+        Writes the index to ``<path>.faiss`` and the stored records to ``<path>.json``.
+        Args:
+            path (str): Base path (without extension) of the files to write.
+        """
+        faiss.write_index(self.index, f"{path}.faiss")
+        with open(f"{path}.json", "wb") as f:
+            f.write(orjson.dumps({"texts": self.texts, "summaries": self.summaries}))
+
+    def load(self, path: str, mmap: bool = False) -> None:
+        """
+        Loads a vector database previously written by save.
+        Args:
+            path (str): Base path (without extension) the files were saved under.
+            mmap (bool): Memory-map the index instead of reading it into memory.
+                A memory-mapped index is read-only, so no data can be added afterwards.
         """
-        self.data = state["data"]
-        embeddings = np.array(state["index"]).astype("float32")
-        self.index.add(embeddings)
\ No newline at end of file
+        flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY if mmap else 0
+        self.index = faiss.read_index(f"{path}.faiss", flags)
+        with open(f"{path}.json", "rb") as f:
+            records = orjson.loads(f.read())
+        self.texts = records["texts"]
+        self.summaries = records["summaries"]
+        self._stored_texts = set(self.texts)
+        self._dict_cache = None
@@ -1,16 +1,21 @@
 import os
-from groq import Groq
-from typing import Dict, Optional, Tuple
+from groq import AsyncGroq
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from pydantic import BaseModel, Field
-from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, BrowserConfig, CacheMode
+from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, CacheMode
 from crawl4ai.extraction_strategy import LLMExtractionStrategy
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 import re
+import bisect
 import time
+import threading
 import logging
+from datetime import datetime
 from dotenv import load_dotenv
 import platform
 import asyncio
+import faiss
+import numpy as np
 
 if platform.system() == "Windows":
     asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
@@ -18,7 +23,9 @@ if platform.system() == "Windows":
 # Internal imports
 from src.crawlgpt.core.DatabaseHandler import VectorDatabase
 from src.crawlgpt.core.SummaryGenerator import SummaryGenerator
-from src.crawlgpt.utils.monitoring import MetricsCollector, RateLimiter, Metrics
+from src.crawlgpt.core.groq_client import get_client, get_async_client
+from src.crawlgpt.core.shared_crawler import create_crawler, get_shared_crawler
+from src.crawlgpt.utils.monitoring import MetricsCollector, RateLimiter, Metrics, approximate_token_count
 from src.crawlgpt.utils.progress import ProgressTracker
 from src.crawlgpt.utils.data_manager import DataManager
 from src.crawlgpt.utils.content_validator import ContentValidator
@@ -31,6 +38,16 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
+# Responses kept per model for exact and near-duplicate queries (least recently used evicted)
+RESPONSE_CACHE_SIZE = 256
+
+# Static instructions kept identical across requests so providers can cache the prompt prefix
+SYSTEM_PROMPT = (
+    "You are an AI assistant. Answer based on the provided context. "
+    "If the answer is not in the context, respond with: "
+    "'I can't retrieve the answer from the context.'"
+)
+
 class Model:
     """
     A language model-based web crawler and content processor.
@@ -40,9 +57,11 @@ class Model:
     and rate limiting.
     
     Attributes:
-        client (Groq): Groq API client
+        client (Groq): Shared Groq API client
+        async_client (AsyncGroq): Shared async Groq API client for the running event loop
         context (str): Current context buffer
-        cache (defaultdict): Cache for processed data
+        context_token_count (int): Approximate token count of the context, counted once per context
+        cache (defaultdict): Cache for processed data, including an LRU of exact-match responses
         database (VectorDatabase): Vector storage for embeddings
         summarizer (SummaryGenerator): Text summarization component
         metrics_collector (MetricsCollector): Tracks usage metrics
@@ -54,21 +73,24 @@ class Model:
         >>> response = model.generate_response("What is this about?", 0.7, 100)
     """
 
-    def __init__(self, rate_limit_rpm: int = 60):
+    def __init__(self, rate_limit_rpm: int = 60, semantic_cache_threshold: float = 0.95,
+                 shared_crawler: bool = False):
         """
         Initialize the model with components and configurations.
         
         Args:
             rate_limit_rpm (int): Maximum requests per minute
+            semantic_cache_threshold (float): Minimum cosine similarity between
+                a new query and a cached one for the cached response to be reused
+            shared_crawler (bool): Crawl with the browser shared by all models on
+                the event loop instead of starting one for this model. Intended
+                for servers; ``aclose()`` then leaves the browser running.
             
         Raises:
             ValueError: If GROQ_API_KEY environment variable is not set
         """
-        # Initialize API client
-        api_key = os.getenv("GROQ_API_KEY")
-        if not api_key:
-            raise ValueError("GROQ_API_KEY environment variable is not set.")
-        self.client = Groq(api_key=api_key)
+        # Shared API client (raises if GROQ_API_KEY is missing)
+        self.client = get_client()
 
         # Core components
         self.context = ""
@@ -76,101 +98,143 @@ class Model:
         self.database = VectorDatabase()
         self.summarizer = SummaryGenerator()
 
+        # Response caches: exact keys in cache["responses"], and embeddings of answered
+        # queries (query_entries, indexed in query_index) for near-duplicates
+        self.semantic_cache_threshold = semantic_cache_threshold
+        self.query_index = faiss.IndexFlatIP(self.database.index.d)
+        self._response_cache_lock = threading.Lock()
+        self._reset_response_cache()
+
+        # Browser crawler, started lazily and reused across extractions on the same event loop
+        self.shared_crawler = shared_crawler
+        self._crawler = None
+        self._crawler_loop = None
+        self._crawler_configs = {}
+
         # Utility components
         self.metrics_collector = MetricsCollector()
         self.data_manager = DataManager()
         self.content_validator = ContentValidator()
         self.rate_limiter = RateLimiter(requests_per_minute=rate_limit_rpm)
 
+    @property
+    def context(self) -> str:
+        """Current context buffer."""
+        return self._context
+
+    @context.setter
+    def context(self, value: str) -> None:
+        self._context = value
+        self._context_token_count = None
+
+    @property
+    def context_token_count(self) -> int:
+        """Token count of the context from approximate_token_count, counted once per context."""
+        if self._context_token_count is None:
+            self._context_token_count = approximate_token_count(self._context)
+        return self._context_token_count
+
     def chunk_text(self, text: str, chunk_size: int = 5000) -> list:
         """
         Split text into chunks, respecting code blocks, paragraphs, and sentences.
-        Maintains original chunking logic while adding progress tracking.
+        Progress is reported by the URL-level tracker in extract_content_from_url.
         """
-        # Initialize progress tracker
-        progress = ProgressTracker(
-            total_steps=len(text) // chunk_size + 1,
-            operation_name="text_chunking"
-        )
+        chunks = [text[start:end].strip() for start, end in self._chunk_spans(text, chunk_size)]
+        return [chunk for chunk in chunks if chunk]
+
+    @staticmethod
+    def _chunk_spans(text: str, chunk_size: int) -> List[Tuple[int, int]]:
+        """
+        Compute the (start, end) offsets of each chunk of text.
+        
+        Boundary candidates are collected once for the whole text and the
+        last one inside each window is found with bisect, so the work per
+        chunk is logarithmic instead of scanning every window.
         
-        chunks = []
+        Args:
+            text (str): Text to split
+            chunk_size (int): Maximum chunk length in characters
+            
+        Returns:
+            List[Tuple[int, int]]: Chunk spans in text order (not yet stripped)
+            
+        Note:
+            Internal method for text chunking
+        """
+        # Lookaheads keep overlapping matches, mirroring str.rfind
+        code_blocks = [m.start() for m in re.finditer(r"(?=```)", text)]
+        paragraphs = [m.start() for m in re.finditer(r"(?=\n\n)", text)]
+        sentences = [m.start() for m in re.finditer(r"(?=\. )", text)]
+        min_offset = chunk_size * 0.3
+
+        def last_in_window(positions: list, start: int, end: int, width: int) -> int:
+            """Return the offset from start of the last match within text[start:end], or -1."""
+            i = bisect.bisect_right(positions, end - width) - 1
+            if i >= 0 and positions[i] >= start:
+                return positions[i] - start
+            return -1
+
+        spans = []
         start = 0
         text_length = len(text)
-        chunk_count = 0
 
         while start < text_length:
-            chunk_count += 1
-            progress.update(chunk_count, f"Processing chunk {chunk_count}")
-            
             end = start + chunk_size
 
             if end >= text_length:
-                chunks.append(text[start:].strip())
+                spans.append((start, text_length))
                 break
 
-            chunk = text[start:end]
             # Preserve original boundary detection logic
-            code_block = chunk.rfind('```')
-            if code_block != -1 and code_block > chunk_size * 0.3:
+            code_block = last_in_window(code_blocks, start, end, 3)
+            last_break = last_in_window(paragraphs, start, end, 2)
+            if code_block != -1 and code_block > min_offset:
                 end = start + code_block
-            elif '\n\n' in chunk:
-                last_break = chunk.rfind('\n\n')
-                if last_break > chunk_size * 0.3:
+            elif last_break != -1:
+                if last_break > min_offset:
                     end = start + last_break
-            elif '. ' in chunk:
-                last_period = chunk.rfind('. ')
-                if last_period > chunk_size * 0.3:
+            else:
+                last_period = last_in_window(sentences, start, end, 2)
+                if last_period > min_offset:
                     end = start + last_period + 1
 
-            chunk = text[start:end].strip()
-            if chunk:
-                chunks.append(chunk)
-
+            spans.append((start, end))
             start = max(start + 1, end)
 
-        progress.complete(f"Successfully created {len(chunks)} chunks")
-        return chunks
+        return spans
 
-    async def extract_content_from_url(self, url: str) -> Tuple[bool, str]:
-        """Extract and process content from a URL."""
-        progress = ProgressTracker(total_steps=5, operation_name="content_extraction")
+    async def extract_content_from_url(self, url: str, session_id: str = "default",
+                                       progress: Optional[ProgressTracker] = None) -> Tuple[bool, str]:
+        """
+        Extract and process content from a URL.
+        
+        The browser is shared across calls made on the same event loop;
+        call ``aclose()`` once crawling is finished to shut it down.
+        
+        Args:
+            url (str): URL to crawl
+            session_id (str): Crawler session (browser page) to reuse
+            progress (Optional[ProgressTracker]): Tracker to report the 5 extraction
+                steps to, e.g. one driving a progress bar; a new one is used if omitted
+            
+        Returns:
+            Tuple[bool, str]: Success flag and status message
+        """
+        if progress is None:
+            progress = ProgressTracker(total_steps=5, operation_name="content_extraction")
         start_time = time.time()
 
         try:
-            # Step 1: Validate URL
-            progress.update(1, "Validating URL")
-            if not self.content_validator.is_valid_url(url):
-                raise ValueError("Invalid URL format")
-
-            # Step 2: Check rate limiting
-            if not self.rate_limiter.can_proceed():
-                raise Exception("Rate limit exceeded. Please try again later.")
-
-            # Step 3: Configure and initialize crawler
-            progress.update(2, "Initializing crawler")
-            browser_config = BrowserConfig( headless=True,
-                                            browser_type="chromium",
-                                            proxy=None
-                                            )
-            crawler_config = self._get_crawler_config()
-
-            # Step 4: Execute crawling
-            progress.update(3, "Crawling content")
-            async with AsyncWebCrawler(config=browser_config) as crawler:
-                result = await crawler.arun(url=url, config=crawler_config)
-                self.context = result.markdown
-
-            # Step 5: Validate and process content
-            progress.update(4, "Validating content")
-            validation_result = self.content_validator.validate_content(self.context)
-            if not validation_result["valid"]:
-                raise ValueError(f"Content validation failed: {validation_result['reason']}")
+            # Steps 1-5: Validate URL, check rate limit, crawl and validate content
+            self.context = await self._crawl_page(url, session_id, progress)
 
             # Step 6: Process content
             progress.update(5, "Processing content")
-            chunks = self.chunk_text(self.context)
-            summaries = [self.summarizer.generate_summary(chunk) for chunk in chunks]
+            # Identical chunks (navigation, footers) are summarized and embedded once
+            chunks = list(dict.fromkeys(self.chunk_text(self.context)))
+            summaries = await self.summarizer.agenerate_summaries(chunks)
             self.database.add_data(chunks, summaries)
+            self._reset_response_cache()
 
             # Record success metrics
             self._record_metrics(True, start_time, len(self.context))
@@ -184,6 +248,122 @@ class Model:
             progress.fail(error_msg)
             return False, error_msg
 
+    async def extract_many(self, urls: List[str], max_concurrent: int = 5) -> List[Tuple[bool, str]]:
+        """
+        Extract and process content from several URLs concurrently.
+        
+        Pages are crawled in parallel (at most ``max_concurrent`` at a time)
+        on the shared browser, each in its own page. The chunks of all
+        successfully crawled pages are then summarized and embedded together
+        in one batch, and the model context becomes their concatenation.
+        
+        Args:
+            urls (List[str]): URLs to crawl
+            max_concurrent (int): Maximum number of pages crawled at once
+            
+        Returns:
+            List[Tuple[bool, str]]: Success flag and status message per URL, in input order
+            
+        Example:
+            >>> results = await model.extract_many(["https://example.com", "https://example.org"])
+        """
+        semaphore = asyncio.Semaphore(max_concurrent)
+        start_times = [time.time()] * len(urls)
+
+        async def crawl(i: int, url: str) -> str:
+            async with semaphore:
+                start_times[i] = time.time()
+                return await self._crawl_page(url, session_id=None)
+
+        # Start the browser once so concurrent tasks don't each launch one
+        await self._ensure_crawler()
+        pages = await asyncio.gather(
+            *(crawl(i, url) for i, url in enumerate(urls)),
+            return_exceptions=True
+        )
+
+        results = [None] * len(urls)
+        crawled = []
+        for i, page in enumerate(pages):
+            if isinstance(page, Exception):
+                error_msg = f"Content extraction failed: {str(page)}"
+                logger.error(error_msg)
+                self._record_metrics(False, start_times[i], 0)
+                results[i] = (False, error_msg)
+            else:
+                crawled.append((i, page))
+
+        if crawled:
+            try:
+                chunks = list(dict.fromkeys(
+                    chunk for _, page in crawled for chunk in self.chunk_text(page)
+                ))
+                summaries = await self.summarizer.agenerate_summaries(chunks)
+                self.database.add_data(chunks, summaries)
+                self._reset_response_cache()
+                self.context = "\n".join(page for _, page in crawled)
+                for i, page in crawled:
+                    self._record_metrics(True, start_times[i], len(page))
+                    results[i] = (True, "Content extraction completed successfully")
+            except Exception as e:
+                error_msg = f"Content extraction failed: {str(e)}"
+                logger.error(error_msg)
+                for i, _ in crawled:
+                    self._record_metrics(False, start_times[i], 0)
+                    results[i] = (False, error_msg)
+
+        return results
+
+    async def _crawl_page(self, url: str, session_id: Optional[str] = None,
+                          progress: Optional[ProgressTracker] = None) -> str:
+        """
+        Validate, crawl and content-check a single URL.
+        
+        Args:
+            url (str): URL to crawl
+            session_id (Optional[str]): Crawler session to reuse, None for a fresh page
+            progress (Optional[ProgressTracker]): Tracker updated for each step
+            
+        Returns:
+            str: Extracted markdown content
+            
+        Raises:
+            ValueError: If the URL or the extracted content is invalid
+            Exception: If the rate limit is exceeded
+            
+        Note:
+            Internal method shared by single and batch extraction
+        """
+        # Step 1: Validate URL
+        if progress:
+            progress.update(1, "Validating URL")
+        if not self.content_validator.is_valid_url(url):
+            raise ValueError("Invalid URL format")
+
+        # Step 2: Check rate limiting
+        if not self.rate_limiter.can_proceed():
+            raise Exception("Rate limit exceeded. Please try again later.")
+
+        # Step 3: Configure and initialize crawler
+        if progress:
+            progress.update(2, "Initializing crawler")
+        crawler = await self._ensure_crawler()
+        crawler_config = self._get_crawler_config(session_id)
+
+        # Step 4: Execute crawling
+        if progress:
+            progress.update(3, "Crawling content")
+        result = await crawler.arun(url=url, config=crawler_config)
+        content = result.markdown
+
+        # Step 5: Validate content
+        if progress:
+            progress.update(4, "Validating content")
+        validation_result = self.content_validator.validate_content(content)
+        if not validation_result["valid"]:
+            raise ValueError(f"Content validation failed: {validation_result['reason']}")
+        return content
+
     def generate_response(
         self, 
         query: str, 
@@ -220,14 +400,15 @@ class Model:
             if not self.rate_limiter.can_proceed():
                 return "Rate limit exceeded. Please try again later."
 
-            # Retrieve and prepare context
-            relevant_context = self.database.search(query, top_k=3)
-            context_items = [item["summary"] if use_summary else item["text"] 
-                            for item in relevant_context]
-            context_summary = "\n".join(context_items)
+            # Serve repeated or near-identical queries from the response cache
+            cache_key = (query, model, use_summary, temperature, max_tokens)
+            cached, query_embedding = self._get_cached_response(cache_key)
+            if cached is not None:
+                self._record_metrics(True, start_time, 0)
+                return cached
 
             # Generate response
-            messages = self._prepare_messages(query, context_summary)
+            messages = self._build_messages(query, query_embedding, use_summary)
             completion = self.client.chat.completions.create(
                 model=model,
                 messages=messages,
@@ -235,6 +416,7 @@ class Model:
                 max_tokens=max_tokens,
             )
             response = completion.choices[0].message.content
+            self._cache_response(cache_key, query_embedding, response)
 
             # Record metrics
             self._record_metrics(True, start_time, max_tokens)
@@ -246,20 +428,354 @@ class Model:
             self._record_metrics(False, start_time, 0)
             return error_msg
 
-    def _get_crawler_config(self) -> CrawlerRunConfig:
-        """Create crawler configuration."""
-        return CrawlerRunConfig(
-            cache_mode=CacheMode.BYPASS,
-            word_count_threshold=1,
-            page_timeout=80000,
-            extraction_strategy=LLMExtractionStrategy(
-                provider="ollama",
-                api_token=os.getenv("OLLAMA_API_TOKEN"),
-                temperature=0,
-                top_p=0.9,
-                max_tokens=10000
+    async def agenerate_response(
+        self, 
+        query: str, 
+        temperature: float, 
+        max_tokens: int, 
+        model: str, 
+        use_summary: bool = True
+    ) -> str:
+        """
+        Asynchronous version of generate_response.
+        
+        The Groq call goes through AsyncGroq and the embedding/search work
+        runs in a worker thread, so the event loop stays free for other
+        requests (e.g. crawls) while the answer is generated.
+        
+        Args:
+            query (str): User query
+            temperature (float): Response randomness (0-1)
+            max_tokens (int): Maximum response length
+            model (str): Model identifier
+            use_summary (bool): Use summarized context
+            
+        Returns:
+            str: Generated response
+            
+        Example:
+            >>> response = await model.agenerate_response(
+            ...     "What is this about?",
+            ...     temperature=0.7,
+            ...     max_tokens=100,
+            ...     model="llama-3.1-8b-instant"
+            ... )
+        """
+        start_time = time.time()
+
+        try:
+            # Check rate limiting
+            if not self.rate_limiter.can_proceed():
+                return "Rate limit exceeded. Please try again later."
+
+            # Serve repeated or near-identical queries from the response cache
+            cache_key = (query, model, use_summary, temperature, max_tokens)
+            cached, query_embedding = await asyncio.to_thread(self._get_cached_response, cache_key)
+            if cached is not None:
+                self._record_metrics(True, start_time, 0)
+                return cached
+
+            # Generate response
+            messages = await asyncio.to_thread(self._build_messages, query, query_embedding, use_summary)
+            completion = await self.async_client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
             )
-        )
+            response = completion.choices[0].message.content
+            self._cache_response(cache_key, query_embedding, response)
+
+            # Record metrics
+            self._record_metrics(True, start_time, max_tokens)
+            return response
+
+        except Exception as e:
+            error_msg = f"API request failed: {str(e)}"
+            logger.error(error_msg)
+            self._record_metrics(False, start_time, 0)
+            return error_msg
+
+    async def generate_response_stream(
+        self, 
+        query: str, 
+        temperature: float, 
+        max_tokens: int, 
+        model: str, 
+        use_summary: bool = True
+    ) -> AsyncIterator[str]:
+        """
+        Generate a response based on stored context, yielding it as it is produced.
+        
+        Same behaviour as generate_response (rate limiting, caching, error
+        messages), but the completion is streamed from the Groq API so the
+        first tokens can be shown before the full answer is ready.
+        
+        Args:
+            query (str): User query
+            temperature (float): Response randomness (0-1)
+            max_tokens (int): Maximum response length
+            model (str): Model identifier
+            use_summary (bool): Use summarized context
+            
+        Yields:
+            str: Consecutive pieces of the response
+            
+        Example:
+            >>> async for piece in model.generate_response_stream(
+            ...     "What is this about?", 0.7, 100, "llama-3.1-8b-instant"
+            ... ):
+            ...     print(piece, end="")
+        """
+        start_time = time.time()
+
+        try:
+            # Check rate limiting
+            if not self.rate_limiter.can_proceed():
+                yield "Rate limit exceeded. Please try again later."
+                return
+
+            # Serve repeated or near-identical queries from the response cache
+            cache_key = (query, model, use_summary, temperature, max_tokens)
+            cached, query_embedding = await asyncio.to_thread(self._get_cached_response, cache_key)
+            if cached is not None:
+                self._record_metrics(True, start_time, 0)
+                yield cached
+                return
+
+            # Stream response
+            messages = await asyncio.to_thread(self._build_messages, query, query_embedding, use_summary)
+            stream = await self.async_client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True,
+            )
+            pieces = []
+            async for chunk in stream:
+                piece = chunk.choices[0].delta.content if chunk.choices else None
+                if piece:
+                    pieces.append(piece)
+                    yield piece
+            self._cache_response(cache_key, query_embedding, "".join(pieces))
+
+            # Record metrics
+            self._record_metrics(True, start_time, max_tokens)
+
+        except Exception as e:
+            error_msg = f"API request failed: {str(e)}"
+            logger.error(error_msg)
+            self._record_metrics(False, start_time, 0)
+            yield error_msg
+
+    def _get_cached_response(self, cache_key: tuple) -> Tuple[Optional[str], np.ndarray]:
+        """
+        Look up a response for the query in the exact and semantic caches.
+        
+        Args:
+            cache_key (tuple): (query, model, use_summary, temperature, max_tokens)
+            
+        Returns:
+            Tuple[Optional[str], np.ndarray]: Cached response (None on a miss)
+            and the query embedding, or None for the embedding on an exact hit
+            
+        Note:
+            Internal method for response caching
+        """
+        responses = self.cache["responses"]
+        with self._response_cache_lock:
+            cached = responses.get(cache_key)
+            if cached is not None:
+                responses.move_to_end(cache_key)
+                # Keep both caches evicting in the same order
+                if cache_key in self.query_entries:
+                    self.query_entries.move_to_end(cache_key)
+                return cached, None
+
+        query_embedding = self.database.encode([cache_key[0]])
+        cached = self._lookup_semantic_cache(query_embedding, cache_key[1:])
+        if cached is not None:
+            with self._response_cache_lock:
+                responses[cache_key] = cached
+                while len(responses) > RESPONSE_CACHE_SIZE:
+                    responses.popitem(last=False)
+        return cached, query_embedding
+
+    def _cache_response(self, cache_key: tuple, query_embedding: np.ndarray, response: str):
+        """
+        Store a generated response for exact and near-duplicate queries.
+        
+        Args:
+            cache_key (tuple): (query, model, use_summary, temperature, max_tokens)
+            query_embedding (np.ndarray): Normalized query embedding of shape (1, dim)
+            response (str): Generated response
+            
+        Note:
+            Internal method for response caching
+        """
+        responses = self.cache["responses"]
+        with self._response_cache_lock:
+            responses[cache_key] = response
+            responses.move_to_end(cache_key)
+            while len(responses) > RESPONSE_CACHE_SIZE:
+                responses.popitem(last=False)
+
+            if cache_key in self.query_entries:
+                self.query_entries[cache_key] = (query_embedding[0], response)
+                self.query_entries.move_to_end(cache_key)
+                return
+            self.query_entries[cache_key] = (query_embedding[0], response)
+            if len(self.query_entries) <= RESPONSE_CACHE_SIZE:
+                self.query_index.add(query_embedding)
+                self._query_keys.append(cache_key)
+                return
+            # faiss flat indexes can't drop single rows, so rebuild from the survivors
+            while len(self.query_entries) > RESPONSE_CACHE_SIZE:
+                self.query_entries.popitem(last=False)
+            self._rebuild_query_index()
+
+    def _rebuild_query_index(self):
+        """
+        Re-index the semantic cache entries in their LRU order.
+        
+        Note:
+            Internal method for response caching; the caller holds the cache lock
+        """
+        self.query_index.reset()
+        self._query_keys = list(self.query_entries)
+        if self._query_keys:
+            self.query_index.add(np.stack([embedding for embedding, _ in self.query_entries.values()]))
+
+    def _build_messages(self, query: str, query_embedding: np.ndarray, use_summary: bool) -> list:
+        """
+        Retrieve relevant context for the query and format the API messages.
+        
+        Args:
+            query (str): User query
+            query_embedding (np.ndarray): Normalized query embedding of shape (1, dim)
+            use_summary (bool): Use summarized context
+            
+        Returns:
+            list: Formatted messages for API
+            
+        Note:
+            Internal method for response generation
+        """
+        relevant_context = self.database.search_by_embedding(query_embedding, top_k=3)
+        key = "summary" if use_summary else "text"
+        context_summary = "\n".join(item[key] for item in relevant_context)
+        return self._prepare_messages(query, context_summary)
+
+    def _lookup_semantic_cache(self, query_embedding, settings: tuple) -> Optional[str]:
+        """
+        Find a cached response for a semantically similar query.
+        
+        Args:
+            query_embedding (np.ndarray): Normalized query embedding of shape (1, dim)
+            settings (tuple): (model, use_summary, temperature, max_tokens) the
+                response must have been generated with
+            
+        Returns:
+            Optional[str]: Cached response, or None on a cache miss
+            
+        Note:
+            Internal method for response caching
+        """
+        with self._response_cache_lock:
+            if self.query_index.ntotal == 0:
+                return None
+            similarities, indices = self.query_index.search(query_embedding, min(5, self.query_index.ntotal))
+            for similarity, i in zip(similarities[0], indices[0]):
+                if i < 0 or similarity < self.semantic_cache_threshold:
+                    break
+                key = self._query_keys[i]
+                if key[1:] == settings and key in self.query_entries:
+                    self.query_entries.move_to_end(key)
+                    return self.query_entries[key][1]
+        return None
+
+    def _reset_response_cache(self):
+        """
+        Drop cached responses, e.g. after the stored context changes.
+        
+        Note:
+            Internal method for response caching
+        """
+        with self._response_cache_lock:
+            self.cache["responses"] = OrderedDict()
+            self.query_index.reset()
+            self.query_entries = OrderedDict()  # cache_key -> (embedding, response)
+            self._query_keys = []  # cache_key of each query_index row
+
+    async def _ensure_crawler(self) -> AsyncWebCrawler:
+        """
+        Return the crawler for this model, starting the browser on first use.
+        
+        A browser started on another event loop cannot be driven from the
+        current one, so a new crawler is started when the loop changes.
+        
+        Returns:
+            AsyncWebCrawler: Started crawler bound to the running event loop
+            
+        Note:
+            Internal method for crawler lifecycle management
+        """
+        if self.shared_crawler:
+            return await get_shared_crawler()
+
+        loop = asyncio.get_running_loop()
+        if self._crawler is not None and self._crawler_loop is loop:
+            return self._crawler
+
+        crawler = create_crawler()
+        await crawler.start()
+        self._crawler = crawler
+        self._crawler_loop = loop
+        return crawler
+
+    async def aclose(self):
+        """
+        Shut down this model's crawler and its browser.
+        
+        A crawler shared between models is left running; see
+        ``shared_crawler.close_shared_crawler``.
+        
+        Example:
+            >>> await model.aclose()
+        """
+        crawler, self._crawler, self._crawler_loop = self._crawler, None, None
+        if crawler is not None:
+            await crawler.close()
+
+    @property
+    def async_client(self) -> AsyncGroq:
+        """Shared async Groq client for the running event loop."""
+        return get_async_client()
+
+    def _get_crawler_config(self, session_id: Optional[str] = None) -> CrawlerRunConfig:
+        """
+        Return the crawler configuration for a session.
+        
+        Configurations are built once per session id and reused, so the
+        extraction strategy and environment lookups are not repeated per URL.
+        """
+        config = self._crawler_configs.get(session_id)
+        if config is None:
+            config = self._crawler_configs[session_id] = CrawlerRunConfig(
+                session_id=session_id,
+                cache_mode=CacheMode.BYPASS,
+                word_count_threshold=1,
+                page_timeout=80000,
+                extraction_strategy=LLMExtractionStrategy(
+                    provider="ollama",
+                    api_token=os.getenv("OLLAMA_API_TOKEN"),
+                    temperature=0,
+                    top_p=0.9,
+                    max_tokens=10000
+                )
+            )
+        return config
 
     def _prepare_messages(self, query: str, context: str) -> list:
         """
@@ -276,13 +792,8 @@ class Model:
             Internal method for message formatting
         """
         return [
-            {"role": "system", "content": f"Context: {context}"},
-            {"role": "user", "content": (
-                "You are an AI assistant. Answer based on the provided context. "
-                "If the answer is not in the context, respond with: "
-                "'I can't retrieve the answer from the context.'\n"
-                f"{query}"
-            )},
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": f"Context:\n{context}\n\nQuestion: {query}"},
         ]
 
     def _record_metrics(self, success: bool, start_time: float, tokens: int):
@@ -312,11 +823,15 @@ class Model:
         """
         self.context = ""
         self.cache.clear()
+        self._reset_response_cache()
 
     def export_current_state(self) -> str:
         """
         Export model state to file.
         
+        The vector index is written with faiss native serialization next to
+        the state file, which only references it by path.
+        
         Returns:
             str: Path to exported state file
             
@@ -324,15 +839,21 @@ class Model:
             >>> state_file = model.export_current_state()
             >>> print(f"State saved to: {state_file}")
         """
+        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+        database_path = os.path.join(self.data_manager.export_dir, f"vector_database_{timestamp}")
+        self.database.save(database_path)
         return self.data_manager.export_data({
             "metrics": self.metrics_collector.metrics.to_dict(),
-            "vector_database": self.database.to_dict()
+            "vector_database_path": database_path
         }, "model_state")
     
     def import_state(self, state: Dict) -> None:
         """
         Import model state from dictionary.
         
+        Accepts either an inline ``vector_database`` dictionary (UI/API
+        backups) or a ``vector_database_path`` written by export_current_state.
+        
         Args:
             state (Dict): State dictionary
             
@@ -340,4 +861,8 @@ class Model:
             >>> model.import_state(loaded_state)
         """
         self.metrics_collector.metrics = Metrics.from_dict(state["metrics"])
-        self.database.from_dict(state["vector_database"])
\ No newline at end of file
+        if "vector_database_path" in state:
+            self.database.load(state["vector_database_path"])
+        else:
+            self.database.from_dict(state["vector_database"])
+        self._reset_response_cache()
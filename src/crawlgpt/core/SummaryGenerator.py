@@ -1,5 +1,18 @@
-from groq import Groq
-import os
+from groq import AsyncGroq
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from typing import Iterator, List, Optional
+import asyncio
+import hashlib
+import threading
+
+from src.crawlgpt.core.groq_client import get_client, get_async_client
+
+# Process-wide LRU of summaries keyed by a hash of model and text, so repeated
+# chunks (re-crawls, shared boilerplate) never hit the API twice
+SUMMARY_CACHE_SIZE = 4096
+_summary_cache = OrderedDict()
+_summary_cache_lock = threading.Lock()
 
 class SummaryGenerator:
     """
@@ -9,7 +22,8 @@ class SummaryGenerator:
     the Groq API service. It requires a valid GROQ_API_KEY environment variable.
     
     Attributes:
-        client (Groq): Initialized Groq API client
+        client (Groq): Shared Groq API client
+        async_client (AsyncGroq): Shared async Groq API client for the running event loop
         
     Examples:
         >>> generator = SummaryGenerator()
@@ -23,15 +37,17 @@ class SummaryGenerator:
     """
     def __init__(self):
         """
-        Initialize the SummaryGenerator with Groq API client.
+        Initialize the SummaryGenerator with the shared Groq API client.
         
         Raises:
             ValueError: If GROQ_API_KEY environment variable is not set
         """
-        api_key = os.getenv("GROQ_API_KEY")
-        if not api_key:
-            raise ValueError("GROQ_API_KEY environment variable is not set.")
-        self.client = Groq(api_key=api_key)
+        self.client = get_client()
+
+    @property
+    def async_client(self) -> AsyncGroq:
+        """Shared async Groq client for the running event loop."""
+        return get_async_client()
 
     def generate_summary(self, text, model="llama-3.1-8b-instant"):
         """
@@ -60,12 +76,212 @@ class SummaryGenerator:
         if not text or not text.strip():
             return ""
         
+        key = self._cache_key(text, model)
+        cached = self._get_cached(key)
+        if cached is not None:
+            return cached
+
         # Generate a summary using the Groq API
-        messages = [
+        completion = self.client.chat.completions.create(
+            model=model, messages=self._summary_messages(text), temperature=0.7, max_tokens=2500
+        )
+        summary = completion.choices[0].message.content.strip()
+        self._set_cached(key, summary)
+        return summary
+
+    def generate_summary_stream(self, text, model="llama-3.1-8b-instant") -> Iterator[str]:
+        """
+        Generate a concise summary, yielding it piece by piece as it is produced.
+        
+        Args:
+            text (str): The text to summarize
+            model (str, optional): The model to use for summarization.
+                                 Defaults to "llama-3.1-8b-instant"
+        
+        Yields:
+            str: Consecutive pieces of the summary
+            
+        Examples:
+            >>> for piece in generator.generate_summary_stream(text):
+            ...     print(piece, end="")
+        """
+        if not text or not text.strip():
+            return
+
+        key = self._cache_key(text, model)
+        cached = self._get_cached(key)
+        if cached is not None:
+            yield cached
+            return
+
+        stream = self.client.chat.completions.create(
+            model=model, messages=self._summary_messages(text), temperature=0.7, max_tokens=2500,
+            stream=True
+        )
+        pieces = []
+        for chunk in stream:
+            piece = chunk.choices[0].delta.content if chunk.choices else None
+            if piece:
+                pieces.append(piece)
+                yield piece
+        self._set_cached(key, "".join(pieces).strip())
+
+    def generate_summaries(self, texts: List[str], model="llama-3.1-8b-instant", max_workers: int = 4) -> List[str]:
+        """
+        Generate summaries for a batch of texts.
+        
+        Requests are issued concurrently (bounded by ``max_workers``) so that
+        the network round-trips to the Groq API overlap instead of running
+        one after another. The longest texts are submitted first to keep the
+        workers evenly loaded.
+        
+        Args:
+            texts (List[str]): The texts to summarize
+            model (str, optional): The model to use for summarization.
+                                 Defaults to "llama-3.1-8b-instant"
+            max_workers (int, optional): Maximum number of concurrent requests.
+                                       Defaults to 4
+        
+        Returns:
+            List[str]: Summaries in the same order as the input texts
+            
+        Examples:
+            >>> generator = SummaryGenerator()
+            >>> summaries = generator.generate_summaries(["First text...", "Second text..."])
+            >>> len(summaries)
+            2
+        """
+        if not texts:
+            return []
+        if len(texts) == 1:
+            return [self.generate_summary(texts[0], model=model)]
+
+        # Schedule longest texts first, then restore the original order
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i] or ""), reverse=True)
+        summaries = [""] * len(texts)
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(texts))) as executor:
+            futures = {i: executor.submit(self.generate_summary, texts[i], model) for i in order}
+            for i, future in futures.items():
+                summaries[i] = future.result()
+        return summaries
+
+    async def agenerate_summary(self, text, model="llama-3.1-8b-instant"):
+        """
+        Asynchronous version of generate_summary using the async Groq client.
+        
+        Args:
+            text (str): The text to summarize
+            model (str, optional): The model to use for summarization.
+                                 Defaults to "llama-3.1-8b-instant"
+        
+        Returns:
+            str: Generated summary of the input text
+        """
+        if not text or not text.strip():
+            return ""
+
+        key = self._cache_key(text, model)
+        cached = self._get_cached(key)
+        if cached is not None:
+            return cached
+
+        completion = await self.async_client.chat.completions.create(
+            model=model, messages=self._summary_messages(text), temperature=0.7, max_tokens=2500
+        )
+        summary = completion.choices[0].message.content.strip()
+        self._set_cached(key, summary)
+        return summary
+
+    async def agenerate_summaries(self, texts: List[str], model="llama-3.1-8b-instant", max_concurrent: int = 8) -> List[str]:
+        """
+        Generate summaries for a batch of texts without blocking the event loop.
+        
+        All requests are dispatched together with asyncio.gather, with at most
+        ``max_concurrent`` in flight, so concurrent extractions share the
+        event loop instead of each occupying worker threads. Duplicate texts
+        are summarized once.
+        
+        Args:
+            texts (List[str]): The texts to summarize
+            model (str, optional): The model to use for summarization.
+                                 Defaults to "llama-3.1-8b-instant"
+            max_concurrent (int, optional): Maximum number of requests in flight.
+                                          Defaults to 8
+        
+        Returns:
+            List[str]: Summaries in the same order as the input texts
+            
+        Examples:
+            >>> summaries = await generator.agenerate_summaries(["First text...", "Second text..."])
+        """
+        semaphore = asyncio.Semaphore(max_concurrent)
+
+        async def summarize(text):
+            async with semaphore:
+                return await self.agenerate_summary(text, model)
+
+        # Repeated texts would all miss the cache at once, so request each only once
+        unique = list(dict.fromkeys(texts))
+        summaries = dict(zip(unique, await asyncio.gather(*(summarize(text) for text in unique))))
+        return [summaries[text] for text in texts]
+
+    @staticmethod
+    def _summary_messages(text):
+        """
+        Build the chat messages for summarizing text.
+        
+        Args:
+            text (str): The text to summarize
+        
+        Returns:
+            list: Messages for the Groq chat completion API
+        """
+        return [
             {"role": "system", "content": "Generate a concise summary for the following text."},
             {"role": "user", "content": text},
         ]
-        completion = self.client.chat.completions.create(
-            model=model, messages=messages, temperature=0.7, max_tokens=2500
-        )
-        return completion.choices[0].message.content.strip()
\ No newline at end of file
+
+    @staticmethod
+    def _cache_key(text, model):
+        """
+        Content hash identifying a summary in the cache.
+        
+        Args:
+            text (str): The text to summarize
+            model (str): The model used for summarization
+        
+        Returns:
+            bytes: Cache key
+        """
+        return hashlib.blake2b(f"{model}\0{text}".encode("utf-8"), digest_size=16).digest()
+
+    @staticmethod
+    def _get_cached(key) -> Optional[str]:
+        """
+        Look up a cached summary, marking it as recently used.
+        
+        Args:
+            key (bytes): Cache key from _cache_key
+        
+        Returns:
+            Optional[str]: Cached summary, or None on a miss
+        """
+        with _summary_cache_lock:
+            summary = _summary_cache.get(key)
+            if summary is not None:
+                _summary_cache.move_to_end(key)
+            return summary
+
+    @staticmethod
+    def _set_cached(key, summary):
+        """
+        Store a summary in the cache, evicting the least recently used entries.
+        
+        Args:
+            key (bytes): Cache key from _cache_key
+            summary (str): Generated summary
+        """
+        with _summary_cache_lock:
+            _summary_cache[key] = summary
+            while len(_summary_cache) > SUMMARY_CACHE_SIZE:
+                _summary_cache.popitem(last=False)
@@ -1,18 +1,46 @@
 # This module provides SQLAlchemy models and database utilities for user management 
 # and chat history persistence.
 
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import create_engine, delete, event, insert, select, Index, Column, Integer, LargeBinary, String, Text, DateTime, ForeignKey
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
+from typing import Dict, List, Tuple
 from passlib.context import CryptContext
+import numpy as np
+from collections import OrderedDict
+import hashlib
+import hmac
 import os
+import secrets
+import threading
+import time
 
 # SQLAlchemy models
 Base = declarative_base()
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing; hashes made with a different cost are upgraded on next login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=int(os.getenv('BCRYPT_ROUNDS', '12'))
+)
+
+# Short-lived cache of successful logins so repeated authentication of the same
+# credentials skips the bcrypt KDF. Keys are HMACs under a per-process random key,
+# so no reusable password digest is kept in memory.
+CREDENTIAL_CACHE_TTL = 60  # seconds
+CREDENTIAL_CACHE_SIZE = 1024
+_credential_cache_key = secrets.token_bytes(32)
+_credential_cache = OrderedDict()  # (username, digest) -> (user, expires_at)
+_credential_cache_lock = threading.Lock()
+
+# Hashes for recent signups, so a retried registration doesn't pay for bcrypt twice
+SIGNUP_HASH_CACHE_SIZE = 256
+_signup_hash_cache = OrderedDict()  # (username, digest) -> password hash
+_signup_hash_cache_lock = threading.Lock()
 
 class User(Base):
     """User model for authentication and chat history tracking.
@@ -27,11 +55,12 @@ class User(Base):
     """
     __tablename__ = 'users'
     id = Column(Integer, primary_key=True)
-    username = Column(String(50), unique=True)
+    username = Column(String(50), unique=True, index=True)
     password_hash = Column(String(60))
     email = Column(String(100))
     created_at = Column(DateTime, default=datetime.utcnow)
     chats = relationship("ChatHistory", back_populates="user")
+    vector_chunks = relationship("VectorChunk", back_populates="user")
 
 class ChatHistory(Base):
     """ChatHistory model for storing chat messages.
@@ -54,11 +83,57 @@ class ChatHistory(Base):
     timestamp = Column(DateTime, default=datetime.utcnow)
     user = relationship("User", back_populates="chats")
 
+    # History is always read per user in timestamp order
+    __table_args__ = (Index('ix_chat_user_ts', 'user_id', 'timestamp'),)
+
+class VectorChunk(Base):
+    """VectorChunk model for storing processed chunks, so a restore can reload them
+    instead of re-chunking, re-summarizing and re-embedding the chat context.
+    
+    Attributes:
+        id (int): Primary key, also the chunk's insertion order
+        user_id (int): Foreign key to User
+        chunk_text (str): Chunk content
+        summary_text (str): Summary of the chunk
+        embedding (bytes): Normalized float32 embedding, as written by numpy's tobytes
+        user (relationship): Many-to-one relationship to User
+    """
+    __tablename__ = 'vector_chunks'
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id'), index=True)
+    chunk_text = Column(Text)
+    summary_text = Column(Text)
+    embedding = Column(LargeBinary)
+    user = relationship("User", back_populates="vector_chunks")
+
 # Database initialization
 engine = create_engine(os.getenv('DATABASE_URL', 'sqlite:///crawlgpt.db'))
+
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        """Use WAL so readers don't block writers and commits avoid a full fsync"""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA cache_size=-65536")  # 64MB page cache
+        cursor.execute("PRAGMA mmap_size=268435456")  # 256MB
+        cursor.close()
+
 Base.metadata.create_all(bind=engine)
+# create_all skips tables that already exist, so add the history index to older databases too
+for index in ChatHistory.__table__.indexes:
+    index.create(bind=engine, checkfirst=True)
+# Each helper opens its own short-lived session; connections come from the engine's pool
 Session = sessionmaker(bind=engine)
 
+# Rows removed per transaction when clearing chat history
+DELETE_BATCH_SIZE = 5000
+
+# Dialects with INSERT ... ON CONFLICT DO NOTHING support
+_UPSERT_DIALECTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
 # Database operations
 def create_user(username: str, password: str, email: str):
     """
@@ -70,15 +145,39 @@ def create_user(username: str, password: str, email: str):
     Returns:
         bool: True if user is created, False if username is taken
     """
+    hashed = _hash_signup_password(username, password)
+    values = dict(username=username, password_hash=hashed, email=email)
+
     with Session() as session:
-        if session.query(User).filter(User.username == username).first():
+        if engine.dialect.name in _UPSERT_DIALECTS:
+            # Let the UNIQUE constraint detect a taken username in the same statement
+            stmt = _UPSERT_DIALECTS[engine.dialect.name](User).values(**values)
+            result = session.execute(stmt.on_conflict_do_nothing(index_elements=['username']))
+            session.commit()
+            return result.rowcount == 1
+        try:
+            session.execute(insert(User).values(**values))
+            session.commit()
+        except IntegrityError:
+            session.rollback()
             return False
-        hashed = pwd_context.hash(password)
-        user = User(username=username, password_hash=hashed, email=email)
-        session.add(user)
-        session.commit()
     return True
 
+def _hash_signup_password(username: str, password: str) -> str:
+    """Hashes a signup password, reusing the hash if the same signup is retried"""
+    key = (username, hmac.new(_credential_cache_key, password.encode(), hashlib.sha256).digest())
+    with _signup_hash_cache_lock:
+        hashed = _signup_hash_cache.get(key)
+        if hashed is not None:
+            _signup_hash_cache.move_to_end(key)
+            return hashed
+    hashed = pwd_context.hash(password)
+    with _signup_hash_cache_lock:
+        _signup_hash_cache[key] = hashed
+        if len(_signup_hash_cache) > SIGNUP_HASH_CACHE_SIZE:
+            _signup_hash_cache.popitem(last=False)
+    return hashed
+
 def authenticate_user(username: str, password: str):
     """
     Authenticates a user with a username and password
@@ -88,11 +187,43 @@ def authenticate_user(username: str, password: str):
     Returns:
         User: User object if authentication is successful, None otherwise
     """
+    cache_key = (username, hmac.new(_credential_cache_key, password.encode(), hashlib.sha256).digest())
+    now = time.monotonic()
+    with _credential_cache_lock:
+        cached = _credential_cache.get(cache_key)
+        if cached and cached[1] > now:
+            return cached[0]
+        _credential_cache.pop(cache_key, None)
+
     with Session() as session:
         user = session.query(User).filter(User.username == username).first()
-        if user and pwd_context.verify(password, user.password_hash):
-            return user
-    return None
+        if not user:
+            return None
+        valid, new_hash = pwd_context.verify_and_update(password, user.password_hash)
+        if not valid:
+            return None
+        if new_hash:
+            user.password_hash = new_hash
+            session.commit()
+            session.refresh(user)
+
+    with _credential_cache_lock:
+        _credential_cache[cache_key] = (user, now + CREDENTIAL_CACHE_TTL)
+        while len(_credential_cache) > CREDENTIAL_CACHE_SIZE:
+            _credential_cache.popitem(last=False)
+    return user
+
+def invalidate_credentials(username: str):
+    """Drops cached logins for a user, e.g. after a password change
+    Args:
+        username (str): Username
+    
+    Returns:
+        None
+    """
+    with _credential_cache_lock:
+        for key in [key for key in _credential_cache if key[0] == username]:
+            del _credential_cache[key]
 
 def save_chat_message(user_id: int, message: str, role: str, context: str):
     """Saves a chat message to the database
@@ -103,17 +234,58 @@ def save_chat_message(user_id: int, message: str, role: str, context: str):
         role (str): Role of the message sender ('user' or 'assistant')
         context (str): Context of the chat message
 
+    Returns:
+        None
+    """
+    save_chat_messages([{
+        "user_id": user_id,
+        "message": message,
+        "role": role,
+        "context": context
+    }])
+
+def save_chat_messages(messages: List[Dict]):
+    """Saves several chat messages in a single bulk INSERT and commit
+
+    Args:
+        messages (List[Dict]): Rows with the keys user_id, message, role and context
+
+    Returns:
+        None
+    """
+    if not messages:
+        return
+    with Session() as session:
+        # Core insert skips the ORM's per-row bookkeeping for bulk writes
+        session.execute(ChatHistory.__table__.insert(), messages)
+        session.commit()
+
+def replace_chat_history(user_id: int, messages: List[Dict]):
+    """Replaces all chat history for a user in a single transaction, dropping their stored chunks
+
+    Args:
+        user_id (int): User ID
+        messages (List[Dict]): Rows with the keys message, role and context
+
     Returns:
         None
     """
     with Session() as session:
-        chat = ChatHistory(
-            user_id=user_id,
-            message=message,
-            role=role,
-            context=context
+        session.execute(
+            delete(ChatHistory)
+            .where(ChatHistory.user_id == user_id)
+            .execution_options(synchronize_session=False)
         )
-        session.add(chat)
+        # Stored chunks belong to the replaced history; restore rebuilds them from the new one
+        session.execute(
+            delete(VectorChunk)
+            .where(VectorChunk.user_id == user_id)
+            .execution_options(synchronize_session=False)
+        )
+        if messages:
+            session.execute(ChatHistory.__table__.insert(), [
+                {**message, "user_id": user_id} for message in messages
+            ])
         session.commit()
 
 def get_chat_history(user_id: int):
@@ -128,22 +300,135 @@ def get_chat_history(user_id: int):
     with Session() as session:
         return session.query(ChatHistory).filter(
             ChatHistory.user_id == user_id
-        ).order_by(ChatHistory.timestamp).all()
+        ).order_by(ChatHistory.timestamp, ChatHistory.id).all()
+        
+def iter_chat_history(user_id: int, batch_size: int = 500):
+    """
+    Yields chat history for a user, fetching rows in batches
+    Args:
+        user_id (int): User ID
+        batch_size (int): Number of rows fetched per round trip
         
+    Yields:
+        ChatHistory: Chat messages in timestamp order
+    """
+    query = (
+        select(ChatHistory)
+        .where(ChatHistory.user_id == user_id)
+        .order_by(ChatHistory.timestamp, ChatHistory.id)
+        .execution_options(yield_per=batch_size)
+    )
+    with Session() as session:
+        yield from session.scalars(query)
+
 def delete_user_chat_history(user_id: int):
-    """Deletes all chat history for a user
+    """Deletes all chat history and stored chunks for a user
     Args:
         user_id (int): User ID
     
     Returns:
         None
     """
+    # Delete in batches so large histories don't hold one long write transaction
+    batch = (
+        select(ChatHistory.id)
+        .where(ChatHistory.user_id == user_id)
+        .limit(DELETE_BATCH_SIZE)
+    )
     with Session() as session:
-        session.query(ChatHistory).filter(
-            ChatHistory.user_id == user_id
-        ).delete()
+        while True:
+            deleted = session.execute(
+                delete(ChatHistory)
+                .where(ChatHistory.id.in_(batch.scalar_subquery()))
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            session.commit()
+            if deleted < DELETE_BATCH_SIZE:
+                break
+        session.execute(
+            delete(VectorChunk)
+            .where(VectorChunk.user_id == user_id)
+            .execution_options(synchronize_session=False)
+        )
         session.commit()
         
+def save_vector_chunks(user_id: int, chunks: List[str], summaries: List[str], embeddings: np.ndarray):
+    """Stores processed chunks with their summaries and embeddings in a single bulk INSERT
+
+    Args:
+        user_id (int): User ID
+        chunks (List[str]): Chunk texts
+        summaries (List[str]): Summaries aligned with chunks
+        embeddings (np.ndarray): Embeddings of shape (len(chunks), dim)
+
+    Returns:
+        None
+    """
+    if not chunks:
+        return
+    embeddings = np.ascontiguousarray(embeddings, dtype="float32")
+    with Session() as session:
+        session.execute(VectorChunk.__table__.insert(), [
+            {
+                "user_id": user_id,
+                "chunk_text": chunk,
+                "summary_text": summary,
+                "embedding": embedding.tobytes()
+            }
+            for chunk, summary, embedding in zip(chunks, summaries, embeddings)
+        ])
+        session.commit()
+
+def save_missing_vector_chunks(user_id: int, chunks: List[str], summaries: List[str], embeddings: np.ndarray):
+    """Stores the chunks whose text isn't stored for the user yet
+
+    A session's vector database skips texts it has seen before, even after the
+    stored rows were deleted, so what an extraction added can't tell what the
+    user is missing; compare against the stored rows instead.
+
+    Args:
+        user_id (int): User ID
+        chunks (List[str]): Chunk texts
+        summaries (List[str]): Summaries aligned with chunks
+        embeddings (np.ndarray): Embeddings of shape (len(chunks), dim)
+
+    Returns:
+        None
+    """
+    stmt = select(VectorChunk.chunk_text).where(VectorChunk.user_id == user_id)
+    with Session() as session:
+        stored = set(session.scalars(stmt))
+    missing = [i for i, chunk in enumerate(chunks) if chunk not in stored]
+    save_vector_chunks(
+        user_id,
+        [chunks[i] for i in missing],
+        [summaries[i] for i in missing],
+        np.asarray(embeddings)[missing]
+    )
+
+def get_vector_chunks(user_id: int, dim: int) -> Tuple[List[str], List[str], np.ndarray]:
+    """Loads a user's stored chunks in insertion order
+    Args:
+        user_id (int): User ID
+        dim (int): Embedding dimension the chunks were stored with
+
+    Returns:
+        Tuple[List[str], List[str], np.ndarray]: Chunk texts, summaries and
+            embeddings of shape (n, dim)
+    """
+    stmt = select(
+        VectorChunk.chunk_text, VectorChunk.summary_text, VectorChunk.embedding
+    ).where(
+        VectorChunk.user_id == user_id
+    ).order_by(VectorChunk.id)
+
+    with Session() as session:
+        rows = session.execute(stmt).all()
+    chunks = [row.chunk_text for row in rows]
+    summaries = [row.summary_text for row in rows]
+    embeddings = np.frombuffer(b"".join(row.embedding for row in rows), dtype="float32")
+    return chunks, summaries, embeddings.reshape(len(rows), dim)
+
 def restore_chat_history(user_id: int):
     """Restores chat history from database to session state
     Args:
@@ -158,14 +443,15 @@ def restore_chat_history(user_id: int):
                 "timestamp": datetime
             }
         """
+    # Select only the needed columns; skips building ORM objects for every row
+    stmt = select(
+        ChatHistory.role.label("role"),
+        ChatHistory.message.label("content"),
+        ChatHistory.context.label("context"),
+        ChatHistory.timestamp.label("timestamp")
+    ).where(
+        ChatHistory.user_id == user_id
+    ).order_by(ChatHistory.timestamp, ChatHistory.id)
+
     with Session() as session:
-        history = session.query(ChatHistory).filter(
-            ChatHistory.user_id == user_id
-        ).order_by(ChatHistory.timestamp).all()
-        
-    return [{
-        "role": msg.role,
-        "content": msg.message,
-        "context": msg.context,
-        "timestamp": msg.timestamp
-    } for msg in history]
\ No newline at end of file
+        return [dict(row) for row in session.execute(stmt).mappings()]
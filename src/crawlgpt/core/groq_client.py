@@ -0,0 +1,68 @@
+# Shared Groq API clients, so every Model/SummaryGenerator reuses one
+# connection pool instead of opening its own.
+
+from groq import Groq, AsyncGroq
+import asyncio
+import os
+import threading
+import weakref
+
+_client = None
+_async_clients = weakref.WeakKeyDictionary()  # event loop -> AsyncGroq
+_lock = threading.Lock()
+
+
+def _get_api_key() -> str:
+    """
+    Reads the Groq API key from the environment.
+
+    Returns:
+        str: The API key
+
+    Raises:
+        ValueError: If GROQ_API_KEY environment variable is not set
+    """
+    api_key = os.getenv("GROQ_API_KEY")
+    if not api_key:
+        raise ValueError("GROQ_API_KEY environment variable is not set.")
+    return api_key
+
+
+def get_client() -> Groq:
+    """
+    Returns the process-wide Groq client, creating it on first use.
+
+    Returns:
+        Groq: Shared synchronous client
+
+    Raises:
+        ValueError: If GROQ_API_KEY environment variable is not set
+    """
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = Groq(api_key=_get_api_key())
+    return _client
+
+
+def get_async_client() -> AsyncGroq:
+    """
+    Returns the AsyncGroq client for the running event loop.
+
+    Async connections belong to the loop that opened them, so one client is
+    kept per event loop and dropped together with it.
+
+    Returns:
+        AsyncGroq: Shared asynchronous client for the current loop
+
+    Raises:
+        ValueError: If GROQ_API_KEY environment variable is not set
+        RuntimeError: If called outside a running event loop
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        client = _async_clients.get(loop)
+        if client is None:
+            client = _async_clients[loop] = AsyncGroq(api_key=_get_api_key())
+    return client
@@ -0,0 +1,73 @@
+# Browser crawler shared by every Model on an event loop, so a long-running
+# server starts Chromium once instead of once per crawl.
+
+from crawl4ai import AsyncWebCrawler, BrowserConfig
+import asyncio
+import threading
+import weakref
+
+_crawlers = weakref.WeakKeyDictionary()  # event loop -> started AsyncWebCrawler
+_start_locks = weakref.WeakKeyDictionary()  # event loop -> asyncio.Lock
+_lock = threading.Lock()
+
+
+def create_crawler() -> AsyncWebCrawler:
+    """
+    Builds a headless Chromium crawler. The caller is responsible for starting it.
+
+    Returns:
+        AsyncWebCrawler: Crawler that has not been started yet
+    """
+    browser_config = BrowserConfig(
+        headless=True,
+        browser_type="chromium",
+        proxy=None,
+        extra_args=["--disable-gpu", "--disable-dev-shm-usage"]
+    )
+    return AsyncWebCrawler(config=browser_config)
+
+
+async def get_shared_crawler() -> AsyncWebCrawler:
+    """
+    Returns the started crawler for the running event loop, starting it on first use.
+
+    A browser is driven from the loop that started it, so one crawler is kept
+    per event loop. Concurrent callers share it; each crawl should run without
+    a session id so it gets its own page.
+
+    Returns:
+        AsyncWebCrawler: Shared crawler for the current loop
+
+    Raises:
+        RuntimeError: If called outside a running event loop
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        crawler = _crawlers.get(loop)
+        if crawler is not None:
+            return crawler
+        start_lock = _start_locks.setdefault(loop, asyncio.Lock())
+
+    # Only one caller launches the browser; the rest wait for it
+    async with start_lock:
+        crawler = _crawlers.get(loop)
+        if crawler is None:
+            crawler = create_crawler()
+            await crawler.start()
+            with _lock:
+                _crawlers[loop] = crawler
+    return crawler
+
+
+async def close_shared_crawler() -> None:
+    """
+    Shuts down the shared crawler of the running event loop, if one was started.
+
+    Example:
+        >>> await close_shared_crawler()
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        crawler = _crawlers.pop(loop, None)
+    if crawler is not None:
+        await crawler.close()
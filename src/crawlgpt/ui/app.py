@@ -16,41 +16,568 @@ The server implements:
 - Data import/export capabilities
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+from flask_compress import Compress
+from werkzeug.exceptions import HTTPException
 from flask_cors import CORS
+import fastjsonschema
+import orjson
 import asyncio
 import time
-from datetime import datetime
 import jwt
 from functools import wraps
+import logging
+import math
 import os
-from collections import defaultdict
+import queue
+import threading
+import atexit
+from collections import OrderedDict
+from contextlib import contextmanager
 
 from src.crawlgpt.core.LLMBasedCrawler import Model
-from src.crawlgpt.core.database import save_chat_message, get_chat_history, delete_user_chat_history, restore_chat_history
-from src.crawlgpt.utils.monitoring import MetricsCollector, Metrics
+from src.crawlgpt.core.shared_crawler import close_shared_crawler
+from src.crawlgpt.core.database import save_chat_messages, get_chat_history, iter_chat_history, delete_user_chat_history, replace_chat_history, restore_chat_history, save_vector_chunks, save_missing_vector_chunks, get_vector_chunks
+from src.crawlgpt.utils.monitoring import MetricsCollector, Metrics, approximate_token_count
 from src.crawlgpt.utils.data_manager import DataManager
 from src.crawlgpt.utils.content_validator import ContentValidator
 from src.crawlgpt.ui.login import authenticate_user, create_user
 
+logger = logging.getLogger(__name__)
+
+class ORJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider that encodes and decodes with orjson.
+    
+    Output matches the default provider: keys are sorted, and dates and other
+    types orjson doesn't handle itself go through DefaultJSONProvider.default.
+    """
+    option = (
+        orjson.OPT_SORT_KEYS
+        | orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_SERIALIZE_NUMPY
+        | orjson.OPT_PASSTHROUGH_DATETIME
+    )
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.option).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        # jsonify() lands here; hand orjson's bytes straight to the response
+        # instead of decoding to str and re-encoding as the default provider does
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self.option | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
 app = Flask(__name__)
+# Match routes with or without a trailing slash instead of redirecting
+app.url_map.strict_slashes = False
+app.json = ORJSONProvider(app)
 CORS(app)
+
+# Compress JSON responses over 1KB (exports, history) for clients that accept it
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_MIMETYPES'] = ['application/json']
+app.config['COMPRESS_MIN_SIZE'] = 1024
+app.config['COMPRESS_BR_LEVEL'] = 4
+app.config['COMPRESS_LEVEL'] = 6  # gzip
+# The streamed /api/export is compressed chunk by chunk; flask-compress can't gzip
+# a stream, so it falls back to brotli or deflate there
+app.config['COMPRESS_ALGORITHM_STREAMING'] = ['br', 'deflate']
+Compress(app)
 app.secret_key = os.environ.get('SECRET_KEY', 'dev-secret-key')  # For JWT token generation
 TOKEN_EXPIRATION = 24 * 60 * 60  # 24 hours
 
+# Token signing uses HS256 with SECRET_KEY by default. Setting JWT_PRIVATE_KEY and
+# JWT_PUBLIC_KEY (Ed25519 PEM) switches to EdDSA, so other services can verify
+# tokens with the public key alone. Keys are prepared once here rather than on
+# every encode/decode call.
+if os.environ.get('JWT_PRIVATE_KEY') and os.environ.get('JWT_PUBLIC_KEY'):
+    JWT_ALGORITHM = "EdDSA"
+    _eddsa = jwt.algorithms.get_default_algorithms()[JWT_ALGORITHM]
+    JWT_SIGNING_KEY = _eddsa.prepare_key(os.environ['JWT_PRIVATE_KEY'].replace('\\n', '\n'))
+    JWT_VERIFY_KEY = _eddsa.prepare_key(os.environ['JWT_PUBLIC_KEY'].replace('\\n', '\n'))
+else:
+    JWT_ALGORITHM = "HS256"
+    JWT_SIGNING_KEY = JWT_VERIFY_KEY = app.secret_key.encode()
+JWT_ALGORITHMS = [JWT_ALGORITHM]
+
 # Initialize global components
 model = Model()
 data_manager = DataManager()
 content_validator = ContentValidator()
 metrics_collector = MetricsCollector()
 
-# User sessions storage (in production, use Redis or a database)
-user_sessions = {}
+# One event loop for the whole server, running in a background thread. Request threads
+# submit coroutines to it instead of building and tearing down a loop per request.
+try:
+    # uvloop's libuv-based loop is faster for the crawler and API I/O when installed
+    import uvloop
+    _event_loop = uvloop.new_event_loop()
+except ImportError:
+    _event_loop = asyncio.new_event_loop()
+threading.Thread(target=_event_loop.run_forever, name="crawlgpt-event-loop", daemon=True).start()
+
+def run_async(coro):
+    """
+    Runs a coroutine on the shared event loop and waits for its result.
+    
+    Args:
+        coro: Coroutine to run
+        
+    Returns:
+        The coroutine's result
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _event_loop).result()
+
+@atexit.register
+def _close_shared_crawler():
+    """Shuts down the browser shared by all sessions' crawls when the server exits."""
+    try:
+        asyncio.run_coroutine_threadsafe(close_shared_crawler(), _event_loop).result(timeout=10)
+    except Exception as e:
+        logger.warning(f"Failed to close the shared crawler: {e}")
+
+# Recently verified JWTs, so repeat requests with the same token skip the HMAC check.
+# The short TTL bounds how long a token is trusted without being re-verified.
+JWT_CACHE_TTL = 30  # seconds
+JWT_CACHE_SIZE = 10000
+_jwt_cache = OrderedDict()  # token -> (user_id, exp, cached_until)
+_jwt_cache_lock = threading.Lock()
+
+# Recently rejected JWTs, so a client replaying bad tokens doesn't cost a signature
+# check each time. Kept apart from _jwt_cache so a flood of junk tokens can only
+# evict other rejections, never valid sessions.
+JWT_REJECT_CACHE_TTL = 60  # seconds
+JWT_REJECT_CACHE_SIZE = 10000
+_jwt_reject_cache = OrderedDict()  # token -> rejected_until
+
+# Serialized /api/chat/history bodies per user. Every route that writes a user's
+# history drops their entry, and the TTL bounds staleness when several worker
+# processes share the database.
+HISTORY_CACHE_TTL = 60  # seconds
+HISTORY_CACHE_SIZE = 1000
+_history_cache = OrderedDict()  # user_id -> (body, cached_until)
+_history_cache_lock = threading.Lock()
+_history_generations = {}  # user_id -> number of times their cached history was invalidated
+
+def _get_cached_history(user_id):
+    """
+    Returns the cached history response body for a user, if still fresh.
+    
+    Args:
+        user_id: ID of the user
+        
+    Returns:
+        Response body bytes, or None on a miss
+    """
+    now = time.monotonic()
+    with _history_cache_lock:
+        entry = _history_cache.get(user_id)
+        if entry is not None:
+            body, cached_until = entry
+            if cached_until > now:
+                _history_cache.move_to_end(user_id)
+                return body
+            del _history_cache[user_id]
+    return None
+
+def _history_generation(user_id):
+    """Returns how many times a user's cached history has been invalidated"""
+    with _history_cache_lock:
+        return _history_generations.get(user_id, 0)
+
+def _cache_history(user_id, body, generation):
+    """
+    Stores a history response body unless history changed while it was built.
+    
+    Args:
+        user_id: ID of the user
+        body: Serialized response body
+        generation: Value of _history_generation(user_id) read before querying the database
+    """
+    with _history_cache_lock:
+        if generation != _history_generations.get(user_id, 0):
+            return
+        _history_cache[user_id] = (body, time.monotonic() + HISTORY_CACHE_TTL)
+        _history_cache.move_to_end(user_id)
+        if len(_history_cache) > HISTORY_CACHE_SIZE:
+            _history_cache.popitem(last=False)
+
+def invalidate_history_cache(user_id):
+    """
+    Drops a user's cached history after their messages change.
+    
+    Args:
+        user_id: ID of the user
+    """
+    with _history_cache_lock:
+        _history_generations[user_id] = _history_generations.get(user_id, 0) + 1
+        _history_cache.pop(user_id, None)
+
+# Chat turns are written by a background thread so /api/chat can respond without
+# waiting on the database. Routes that read or replace a user's history call
+# flush_chat_writes(user_id) first so they see every turn already answered.
+CHAT_WRITE_RETRY_DELAYS = (0.5, 2, 5)  # seconds to wait before each retry of a failed insert
+CHAT_WRITE_RETRY_INTERVAL = 10  # seconds between later attempts while the database is down
+CHAT_FLUSH_TIMEOUT = 30  # seconds a flush waits for a user's pending turns
+_chat_write_queue = queue.Queue()
+_pending_chat_writes = {}  # user_id -> turns queued (or kept after a failure) but not saved yet
+_chat_writes_done = threading.Condition()
+
+def _save_chat_batch(rows):
+    """
+    Inserts a batch of chat turns, retrying with backoff.
+    
+    Args:
+        rows: Rows with the keys user_id, message, role and context
+        
+    Returns:
+        True once the rows are saved, False if every attempt failed
+    """
+    for delay in (*CHAT_WRITE_RETRY_DELAYS, None):
+        try:
+            save_chat_messages(rows)
+            return True
+        except Exception as e:
+            if delay is None:
+                logger.exception(f"Failed to save {len(rows)} chat messages; keeping them for the next attempt")
+                return False
+            logger.warning(f"Saving {len(rows)} chat messages failed, retrying in {delay}s: {str(e)}")
+            time.sleep(delay)
+
+def _chat_writer():
+    """Saves queued chat turns, batching whatever has piled up into one insert."""
+    failed = []  # turns from batches that couldn't be saved, retried first
+    while True:
+        try:
+            # With failed turns waiting, wake up periodically to retry them
+            rows = [_chat_write_queue.get(timeout=CHAT_WRITE_RETRY_INTERVAL if failed else None)]
+        except queue.Empty:
+            rows = []
+        while True:
+            try:
+                rows.append(_chat_write_queue.get_nowait())
+            except queue.Empty:
+                break
+        batch = failed + rows
+        if not _save_chat_batch(batch):
+            failed = batch
+            continue
+        failed = []
+        user_ids = {row["user_id"] for row in batch}
+        for user_id in user_ids:
+            invalidate_history_cache(user_id)
+        with _chat_writes_done:
+            for row in batch:
+                _pending_chat_writes[row["user_id"]] -= 1
+            for user_id in user_ids:
+                if not _pending_chat_writes[user_id]:
+                    del _pending_chat_writes[user_id]
+            _chat_writes_done.notify_all()
+
+def queue_chat_messages(messages):
+    """
+    Queues chat messages to be saved by the background writer.
+    
+    Args:
+        messages: Rows with the keys user_id, message, role and context
+    """
+    with _chat_writes_done:
+        for message in messages:
+            user_id = message["user_id"]
+            _pending_chat_writes[user_id] = _pending_chat_writes.get(user_id, 0) + 1
+    for message in messages:
+        _chat_write_queue.put(message)
+    # Cached history is already out of date; the writer drops it again once saved
+    for user_id in {message["user_id"] for message in messages}:
+        invalidate_history_cache(user_id)
+
+def flush_chat_writes(user_id=None, timeout=CHAT_FLUSH_TIMEOUT):
+    """
+    Blocks until the chat turns queued for a user have been written.
+    
+    Args:
+        user_id: ID of the user to wait for, or None to wait for every user
+        timeout: Maximum number of seconds to wait
+        
+    Returns:
+        True if the turns were written, False if the wait timed out
+    """
+    def flushed():
+        if user_id is None:
+            return not _pending_chat_writes
+        return user_id not in _pending_chat_writes
+    
+    with _chat_writes_done:
+        done = _chat_writes_done.wait_for(flushed, timeout)
+    if not done:
+        logger.warning(f"Chat turns for user {user_id} still unsaved after {timeout}s")
+    return done
+
+threading.Thread(target=_chat_writer, daemon=True, name="chat-writer").start()
+# Don't lose answered turns when the server shuts down
+atexit.register(flush_chat_writes)
+
+class SessionCache(OrderedDict):
+    """
+    Bounded LRU of per-user sessions.
+    
+    Each session holds a full Model with its vector database, so only the most
+    recently used sessions are kept in memory, and sessions left idle for
+    idle_ttl seconds are evicted even when there is room. Evicted sessions are
+    written to spill_dir and loaded back the next time their user makes a
+    request; users seen for the first time get a fresh session. Spilling and
+    restoring happen outside the cache lock, so only lookups for the user being
+    moved wait on the disk. Sessions held
+    through in_use() are never evicted, so a long request can't keep writing
+    to a session whose snapshot is already on disk.
+    
+    Attributes:
+        maxsize (int): Maximum number of idle sessions kept in memory; sessions
+            in use may push the cache past it until their requests finish
+        spill_dir (str): Directory where evicted sessions are stored
+        idle_ttl (float): Seconds a session may go unused before it is evicted
+    """
+    def __init__(self, maxsize: int, spill_dir: str, idle_ttl: float = 3600):
+        super().__init__()
+        self.maxsize = maxsize
+        self.spill_dir = spill_dir
+        self.idle_ttl = idle_ttl
+        self._last_used = {}  # user_id -> monotonic time of last access
+        self._in_use = {}  # user_id -> number of requests holding the session
+        self._lock = threading.RLock()
+        self._moving = {}  # user_id -> lock held while the session is spilled or restored
+    
+    def __getitem__(self, user_id):
+        with self._lock:
+            if user_id not in self:
+                session = None
+            else:
+                session = super().__getitem__(user_id)
+                evicted = self._touch(user_id)
+        if session is None:
+            return self.__missing__(user_id)
+        self._spill_evicted(evicted)
+        return session
+    
+    def __setitem__(self, user_id, session):
+        with self._lock:
+            evicted = self._insert(user_id, session)
+        self._spill_evicted(evicted)
+    
+    def _insert(self, user_id, session):
+        """Stores a session and returns the sessions evicted to make room for it"""
+        super().__setitem__(user_id, session)
+        return self._touch(user_id) + self._evict_over_capacity(keep=user_id)
+    
+    @contextmanager
+    def in_use(self, user_id):
+        """
+        Holds a user's session for the duration of a request, loading it if needed.
+        
+        Args:
+            user_id: ID of the user
+            
+        Yields:
+            dict: The user's session, which stays in memory until the block exits
+        """
+        with self._lock:
+            self._in_use[user_id] = self._in_use.get(user_id, 0) + 1
+        try:
+            session = self[user_id]
+        except BaseException:
+            self._release(user_id)
+            raise
+        try:
+            yield session
+        finally:
+            self._release(user_id)
+    
+    def _release(self, user_id):
+        """Drops one hold on a session; the end of a request counts as a use"""
+        evicted = []
+        with self._lock:
+            self._in_use[user_id] -= 1
+            if not self._in_use[user_id]:
+                del self._in_use[user_id]
+                if user_id in self:
+                    evicted = self._touch(user_id) + self._evict_over_capacity(keep=user_id)
+        self._spill_evicted(evicted)
+    
+    def _touch(self, user_id):
+        """Marks a session as just used and evicts sessions that have gone idle, returning them to spill"""
+        now = time.monotonic()
+        self.move_to_end(user_id)
+        self._last_used[user_id] = now
+        # Least recently used sessions sit at the front, so stop at the first fresh one
+        cutoff = now - self.idle_ttl
+        idle = []
+        for other in self:
+            if self._last_used[other] >= cutoff:
+                break
+            if other not in self._in_use:
+                idle.append(other)
+        return [self._evict(other) for other in idle]
+    
+    def _evict_over_capacity(self, keep):
+        """Evicts the least recently used sessions not in use, other than keep, until within maxsize"""
+        excess = len(self) - self.maxsize
+        if excess <= 0:
+            return []
+        evictable = [
+            user_id for user_id in self
+            if user_id != keep and user_id not in self._in_use
+        ][:excess]
+        return [self._evict(user_id) for user_id in evictable]
+    
+    def _evict(self, user_id):
+        """
+        Removes a session from memory, to be spilled once the cache lock is released.
+        
+        Lookups for the user wait on its move lock until the spill is on disk.
+        """
+        session = self.pop(user_id)
+        del self._last_used[user_id]
+        self._moving[user_id] = threading.Lock()
+        self._moving[user_id].acquire()
+        return user_id, session
+    
+    def _spill_evicted(self, evicted):
+        """Writes evicted sessions to disk and lets lookups waiting on them continue"""
+        for user_id, session in evicted:
+            try:
+                self._spill(user_id, session)
+            except Exception:
+                logger.exception(f"Failed to spill the session of user {user_id}")
+            finally:
+                with self._lock:
+                    self._moving.pop(user_id).release()
+    
+    def __missing__(self, user_id):
+        """Loads a session without holding the cache lock; lookups for the same user wait for it"""
+        while True:
+            with self._lock:
+                loaded = user_id in self
+                moving = None if loaded else self._moving.get(user_id)
+                if not loaded and moving is None:
+                    # Claim the restore; other lookups for this user wait on the lock
+                    self._moving[user_id] = threading.Lock()
+                    self._moving[user_id].acquire()
+            if loaded:
+                return self[user_id]
+            if moving is None:
+                break
+            # Another request is spilling or restoring this session; wait and look again
+            with moving:
+                pass
+        try:
+            session = self._restore(user_id)
+        except BaseException:
+            with self._lock:
+                self._moving.pop(user_id).release()
+            raise
+        with self._lock:
+            self._moving.pop(user_id).release()
+            evicted = self._insert(user_id, session)
+        self._spill_evicted(evicted)
+        return session
+    
+    def _spill_path(self, user_id):
+        return os.path.join(self.spill_dir, f"user_{user_id}")
+    
+    def _spill(self, user_id, session):
+        """Writes an evicted session to disk, skipping sessions with nothing loaded"""
+        model = session['model']
+        if model.database.is_empty() and not model.context:
+            return
+        os.makedirs(self.spill_dir, exist_ok=True)
+        path = self._spill_path(user_id)
+        model.database.save(path)
+        with open(f"{path}.session.json", "wb") as f:
+            f.write(orjson.dumps({
+                "context": model.context,
+                "metrics": session['metrics'].metrics.to_dict(),
+                "url_processed": session['url_processed']
+            }))
+    
+    def _restore(self, user_id):
+        """Loads a spilled session back from disk, or creates a new one"""
+        session = {
+            'model': Model(shared_crawler=True),
+            'metrics': MetricsCollector(),
+            'url_processed': False
+        }
+        path = self._spill_path(user_id)
+        if os.path.exists(f"{path}.session.json"):
+            with open(f"{path}.session.json", "rb") as f:
+                state = orjson.loads(f.read())
+            session['model'].database.load(path)
+            session['model'].context = state["context"]
+            session['metrics'].metrics = Metrics.from_dict(state["metrics"])
+            session['url_processed'] = state["url_processed"]
+            for ext in (".faiss", ".json", ".session.json"):
+                os.remove(f"{path}{ext}")
+        return session
+
+# User sessions storage. Models hold a vector database, so they always stay in-process
+MAX_USER_SESSIONS = int(os.environ.get('MAX_USER_SESSIONS', '500'))
+SESSION_IDLE_TTL = float(os.environ.get('SESSION_IDLE_TTL', '3600'))  # seconds
+user_sessions = SessionCache(
+    MAX_USER_SESSIONS,
+    os.environ.get('SESSION_SPILL_DIR', 'sessions'),
+    idle_ttl=SESSION_IDLE_TTL
+)
+
+# Optional Redis for state shared between workers (rate limits and session flags).
+# Set REDIS_URL to enable it; without it, that state is kept in this process.
+redis_client = None
+
+# Token bucket refill-and-spend as one atomic step. KEYS[1] is the user's bucket hash;
+# ARGV holds the current time, the capacity and the refill rate in tokens per second.
+# Returns whether the request is allowed and the tokens left (as a string, since Redis
+# truncates Lua numbers to integers).
+TOKEN_BUCKET_SCRIPT = """
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local now = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local rate = tonumber(ARGV[3])
+local tokens = tonumber(state[1]) or capacity
+local last = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - last) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', ARGV[1])
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return {allowed, tostring(tokens)}
+"""
+
+if os.environ.get('REDIS_URL'):
+    try:
+        import redis
+        client = redis.Redis.from_url(os.environ['REDIS_URL'])
+        _redis_token_bucket = client.register_script(TOKEN_BUCKET_SCRIPT)
+        redis_client = client
+    except Exception as e:
+        logger.warning(f"Redis unavailable, keeping shared state in-process: {str(e)}")
 
 
 # Rate limiting configuration
 RATE_LIMIT = 10  # requests per minute
-rate_limit_data = defaultdict(list)  # stores timestamps of requests by user_id
+REFILL_RATE = RATE_LIMIT / 60  # tokens per second
+rate_limit_data = {}  # token bucket per user_id: [tokens, last_refill (monotonic)]
+_rate_limit_lock = threading.Lock()
+
+# Header values that only depend on constants, built once instead of per request
+_RATE_LIMIT_HEADER = str(RATE_LIMIT)
+_REMAINING_HEADERS = tuple(str(n) for n in range(RATE_LIMIT + 1))
 
 def rate_limit(f):
     """
@@ -70,50 +597,124 @@ def rate_limit(f):
         # Get current time
         current_time = time.time()
         
-        # Clean up old timestamps (older than 1 minute)
-        rate_limit_data[current_user_id] = [
-            t for t in rate_limit_data[current_user_id] 
-            if current_time - t < 60
-        ]
+        allowed, remaining, reset = _consume_rate_limit(current_user_id, current_time)
         
-        # Check if user has exceeded rate limit
-        if len(rate_limit_data[current_user_id]) >= RATE_LIMIT:
+        if not allowed:
             response = jsonify({
                 'success': False, 
                 'message': 'Rate limit exceeded. Please try again later.'
             }), 429
-            response[0].headers['X-RateLimit-Limit'] = str(RATE_LIMIT)
-            response[0].headers['X-RateLimit-Remaining'] = '0'
-            response[0].headers['X-RateLimit-Reset'] = str(int(min(rate_limit_data[current_user_id]) + 60))
+            _set_rate_limit_headers(response[0].headers, 0, reset)
+            response[0].headers['Retry-After'] = str(max(1, math.ceil(reset - current_time)))
             return response
         
-        # Add current timestamp to user's requests
-        rate_limit_data[current_user_id].append(current_time)
-        
         # Process the request
         response = f(current_user_id, *args, **kwargs)
         
         # Add rate limit headers if response is a tuple (response, status_code)
         if isinstance(response, tuple) and len(response) >= 1:
-            response[0].headers['X-RateLimit-Limit'] = str(RATE_LIMIT)
-            response[0].headers['X-RateLimit-Remaining'] = str(RATE_LIMIT - len(rate_limit_data[current_user_id]))
-            response[0].headers['X-RateLimit-Reset'] = str(int(current_time + 60))
+            _set_rate_limit_headers(response[0].headers, remaining, reset)
         # If response is just a response object
         elif hasattr(response, 'headers'):
-            response.headers['X-RateLimit-Limit'] = str(RATE_LIMIT)
-            response.headers['X-RateLimit-Remaining'] = str(RATE_LIMIT - len(rate_limit_data[current_user_id]))
-            response.headers['X-RateLimit-Reset'] = str(int(current_time + 60))
+            _set_rate_limit_headers(response.headers, remaining, reset)
             
         return response
     
     return decorated
 
+def _set_rate_limit_headers(headers, remaining, reset):
+    """
+    Adds the X-RateLimit-* headers to a response.
+    
+    Args:
+        headers: Headers of the outgoing response
+        remaining: Requests left in the user's allowance
+        reset: UNIX timestamp when the allowance is next replenished
+    """
+    headers['X-RateLimit-Limit'] = _RATE_LIMIT_HEADER
+    headers['X-RateLimit-Remaining'] = _REMAINING_HEADERS[remaining]
+    headers['X-RateLimit-Reset'] = str(reset)
+
+def _consume_rate_limit(user_id, current_time):
+    """
+    Spends one request from the user's rate limit allowance.
+    
+    Each user has a token bucket holding up to RATE_LIMIT tokens that refills at
+    RATE_LIMIT tokens per minute. With Redis the bucket is shared by all workers
+    and updated atomically by a Lua script; otherwise, or while Redis is
+    unreachable, it is kept in-process.
+    
+    Args:
+        user_id: ID of the user making the request
+        current_time: Current UNIX timestamp
+        
+    Returns:
+        Tuple of (allowed, remaining requests, reset timestamp)
+    """
+    allowed = None
+    if redis_client is not None:
+        try:
+            # Workers on different hosts share the bucket, so it runs on wall-clock time
+            allowed, tokens = _redis_token_bucket(
+                keys=[f"rl:{user_id}"],
+                args=[current_time, RATE_LIMIT, REFILL_RATE]
+            )
+            allowed, tokens = bool(allowed), float(tokens)
+        except redis.RedisError as e:
+            logger.error(f"Redis rate limit failed, using the in-process bucket: {str(e)}")
+            allowed = None
+    if allowed is None:
+        # Refill using the monotonic clock so wall-clock adjustments can't drain or overfill buckets
+        now = time.monotonic()
+        with _rate_limit_lock:
+            state = rate_limit_data.get(user_id)
+            if state is None:
+                state = rate_limit_data[user_id] = [RATE_LIMIT, now]
+            else:
+                # Refill lazily for the time elapsed since the last request
+                state[0] = min(RATE_LIMIT, state[0] + (now - state[1]) * REFILL_RATE)
+                state[1] = now
+            
+            allowed = state[0] >= 1
+            if allowed:
+                state[0] -= 1
+            tokens = state[0]
+    
+    if not allowed:
+        # Reset when the next token becomes available
+        return False, 0, int(current_time + (1 - tokens) / REFILL_RATE)
+    # Reset when the bucket is full again
+    return True, int(tokens), int(current_time + (RATE_LIMIT - tokens) / REFILL_RATE)
+
+def is_url_processed(user_id):
+    """Returns whether the user has content loaded for chatting"""
+    if redis_client is not None:
+        try:
+            return redis_client.hget(f"sess:{user_id}", 'url_processed') == b'1'
+        except redis.RedisError as e:
+            logger.error(f"Redis lookup failed, using the in-process flag: {str(e)}")
+    return user_sessions[user_id]['url_processed']
+
+def set_url_processed(user_id, processed):
+    """Records whether the user has content loaded for chatting"""
+    # Always kept in-process too, as the fallback while Redis is unreachable
+    user_sessions[user_id]['url_processed'] = processed
+    if redis_client is not None:
+        key = f"sess:{user_id}"
+        try:
+            pipe = redis_client.pipeline()
+            pipe.hset(key, 'url_processed', int(processed))
+            pipe.expire(key, TOKEN_EXPIRATION)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.error(f"Redis update failed, keeping the flag in-process: {str(e)}")
+
 def token_required(f):
     """
     Decorator that enforces JWT authentication for API endpoints.
     
     Extracts and validates JWT token from Authorization header.
-    Creates a user session if one doesn't exist.
+    Creates a user session if one doesn't exist and holds it while the view runs.
     
     Args:
         f: The function to decorate
@@ -123,30 +724,129 @@ def token_required(f):
     """
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = None
-        if 'Authorization' in request.headers:
-            token = request.headers['Authorization'].split(" ")[1]
+        auth_header = request.headers.get('Authorization', '')
+        token = auth_header[7:] if auth_header.startswith('Bearer ') else None
         
         if not token:
             return jsonify({'message': 'Token is missing!'}), 401
         
         try:
-            data = jwt.decode(token, app.secret_key, algorithms=["HS256"])
-            current_user_id = data['user_id']
-            
-            # Initialize user session if not exists
-            if current_user_id not in user_sessions:
-                user_sessions[current_user_id] = {
-                    'model': Model(),
-                    'metrics': MetricsCollector(),
-                    'url_processed': False
-                }
-        except:
+            current_user_id = _verify_token(token)
+        except (jwt.InvalidTokenError, KeyError):
             return jsonify({'message': 'Token is invalid!'}), 401
-            
-        return f(current_user_id, *args, **kwargs)
+        
+        # Load or initialize the user session and keep it in memory until the view returns
+        with user_sessions.in_use(current_user_id):
+            return f(current_user_id, *args, **kwargs)
     return decorated
 
+def _verify_token(token):
+    """
+    Validates a JWT and returns its user ID, reusing recent verifications and rejections.
+    
+    Args:
+        token: Encoded JWT from the Authorization header
+        
+    Returns:
+        User ID stored in the token claims
+        
+    Raises:
+        jwt.InvalidTokenError: If the token fails validation
+        KeyError: If the token lacks the user_id or exp claim
+    """
+    now = time.time()
+    with _jwt_cache_lock:
+        entry = _jwt_cache.get(token)
+        if entry is not None:
+            user_id, exp, cached_until = entry
+            if exp > now and cached_until > now:
+                _jwt_cache.move_to_end(token)
+                return user_id
+            del _jwt_cache[token]
+        
+        rejected_until = _jwt_reject_cache.get(token)
+        if rejected_until is not None:
+            if rejected_until > now:
+                raise jwt.InvalidTokenError("Token was recently rejected")
+            del _jwt_reject_cache[token]
+    
+    try:
+        data = jwt.decode(token, JWT_VERIFY_KEY, algorithms=JWT_ALGORITHMS)
+        user_id, exp = data['user_id'], data['exp']
+    except (jwt.InvalidTokenError, KeyError):
+        with _jwt_cache_lock:
+            _jwt_reject_cache[token] = now + JWT_REJECT_CACHE_TTL
+            if len(_jwt_reject_cache) > JWT_REJECT_CACHE_SIZE:
+                _jwt_reject_cache.popitem(last=False)
+        raise
+    
+    with _jwt_cache_lock:
+        _jwt_cache[token] = (user_id, exp, now + JWT_CACHE_TTL)
+        if len(_jwt_cache) > JWT_CACHE_SIZE:
+            _jwt_cache.popitem(last=False)
+    return user_id
+
+# Structure of a backup accepted by /api/import, compiled to a validator once at startup
+validate_import_data = fastjsonschema.compile({
+    'type': 'object',
+    'required': ['metrics', 'vector_database', 'messages'],
+    'properties': {
+        'metrics': {'type': 'object'},
+        'vector_database': {'type': 'object'},
+        'messages': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'required': ['content', 'role'],
+                'properties': {
+                    'content': {'type': 'string'},
+                    'role': {'type': 'string'},
+                    'context': {'type': ['string', 'null']}
+                }
+            }
+        }
+    }
+})
+
+# Rows serialized per chunk of a streamed export
+EXPORT_BATCH_SIZE = 500
+
+def _batched(items, size):
+    """
+    Groups an iterable into lists of up to size items.
+    
+    Args:
+        items: Iterable to group
+        size: Maximum number of items per list
+        
+    Returns:
+        Generator of lists in input order
+    """
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+@app.errorhandler(Exception)
+def handle_unexpected_error(e):
+    """
+    Turns errors that escape a view into a logged JSON 500 response.
+    
+    Args:
+        e: The unhandled exception
+        
+    Returns:
+        The HTTP error itself for HTTP exceptions, otherwise a JSON error response
+    """
+    if isinstance(e, HTTPException):
+        return e
+    logger.exception(f"Unhandled error in {request.path}")
+    return jsonify({'success': False, 'message': 'Internal server error'}), 500
+
 # ----- PUBLIC ENDPOINTS -----
 
 @app.route('/', methods=['GET'])
@@ -170,18 +870,15 @@ def register():
     Returns:
         JSON response indicating success or failure
     """
-    data = request.json
+    data = request.get_json(silent=True, cache=False) or {}
     username = data.get('username')
     password = data.get('password')
     email = data.get('email')
     if not username or not password or not email:
         return jsonify({'message': 'Username, password and email are required!'}), 400
-    # Check if user already exists
-    existing_user = authenticate_user(username, password)
-    if existing_user:
+    # Create user; the username's UNIQUE constraint reports an existing user
+    if not create_user(username, password, email):
         return jsonify({'message': 'User already exists!'}), 400
-    # Create user (adapt from your login.py)
-    create_user(username, password, email)
     
     return jsonify({'message': 'User created successfully!'})
     
@@ -196,7 +893,7 @@ def login():
     Returns:
         JSON with token and user information on success, error message on failure
     """
-    auth = request.json
+    auth = request.get_json(silent=True, cache=False) or {}
     
     if not auth or not auth.get('username') or not auth.get('password'):
         return jsonify({'message': 'Could not verify'}), 401
@@ -211,8 +908,8 @@ def login():
     token = jwt.encode({
         'user_id': user.id,
         'username': user.username,
-        'exp': datetime.utcnow().timestamp() + TOKEN_EXPIRATION
-    }, app.secret_key, algorithm="HS256")
+        'exp': int(time.time()) + TOKEN_EXPIRATION
+    }, JWT_SIGNING_KEY, algorithm=JWT_ALGORITHM)
     
     return jsonify({'token': token, 'user': {'id': user.id, 'username': user.username}})
 
@@ -234,7 +931,7 @@ def process_url(current_user_id):
     Returns:
         JSON indicating success/failure and appropriate messages
     """
-    data = request.json
+    data = request.get_json(silent=True, cache=False) or {}
     url = data.get('url')
     
     if not url or not url.strip():
@@ -243,58 +940,43 @@ def process_url(current_user_id):
     user_session = user_sessions[current_user_id]
     model = user_session['model']
     
+    if not content_validator.is_valid_url(url):
+        return jsonify({'success': False, 'message': 'Invalid URL format'}), 400
+    
+    start_time = time.time()
     try:
-        if not content_validator.is_valid_url(url):
-            return jsonify({'success': False, 'message': 'Invalid URL format'}), 400
-        
-        # Create async task for extraction
-        async def extract_content():
-            start_time = time.time()
-            
-            try:
-                success, msg = await model.extract_content_from_url(url)
-                
-                if success:
-                    user_session['url_processed'] = True
-                    user_session['metrics'].record_request(
-                        success=True,
-                        response_time=time.time() - start_time,
-                        tokens_used=len(model.context.split())
-                    )
-                    
-                    # Save system message about URL processing
-                    save_chat_message(
-                        current_user_id,
-                        f"Content from {url} processed",
-                        "system",
-                        model.context
-                    )
-                    
-                    return {'success': True, 'message': 'URL processed successfully'}
-                else:
-                    return {'success': False, 'message': msg}
-                    
-            except Exception as e:
-                user_session['metrics'].record_request(
-                    success=False,
-                    response_time=time.time() - start_time,
-                    tokens_used=0
-                )
-                return {'success': False, 'message': str(e)}
-        
-        # Using a more explicit approach to run the async function
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            result = loop.run_until_complete(extract_content())
-        finally:
-            loop.close()
-        
-        # Return the result
-        return jsonify(result)
-        
+        # Crawl on the shared event loop and browser, in a page of its own
+        success, msg = run_async(model.extract_content_from_url(url, session_id=None))
     except Exception as e:
-        return jsonify({'success': False, 'message': f"Error processing URL: {str(e)}"}), 500
+        logger.exception(f"Crawl of {url} failed")
+        user_session['metrics'].record_request(
+            success=False,
+            response_time=time.time() - start_time,
+            tokens_used=0
+        )
+        return jsonify({'success': False, 'message': str(e)})
+    
+    if not success:
+        return jsonify({'success': False, 'message': msg})
+    
+    # Persist the chunks so a restore can reload them instead of re-summarizing
+    save_missing_vector_chunks(current_user_id, *model.database.records_since(0))
+    set_url_processed(current_user_id, True)
+    user_session['metrics'].record_request(
+        success=True,
+        response_time=time.time() - start_time,
+        tokens_used=model.context_token_count
+    )
+    
+    # Save system message about URL processing, queued behind any pending chat turns
+    queue_chat_messages([{
+        "user_id": current_user_id,
+        "message": f"Content from {url} processed",
+        "role": "system",
+        "context": model.context
+    }])
+    
+    return jsonify({'success': True, 'message': 'URL processed successfully'})
 
 @app.route('/api/chat', methods=['POST'])
 @token_required
@@ -312,7 +994,7 @@ def chat_endpoint(current_user_id):
     Returns:
         JSON with AI response or error message
     """
-    data = request.json
+    data = request.get_json(silent=True, cache=False) or {}
     user_message = data.get('message')
     temperature = data.get('temperature', 0.7)
     max_tokens = data.get('max_tokens', 5000)
@@ -322,56 +1004,55 @@ def chat_endpoint(current_user_id):
     user_session = user_sessions[current_user_id]
     model = user_session['model']
     
-    if not user_session['url_processed']:
+    if not is_url_processed(current_user_id):
         return jsonify({'success': False, 'message': 'Please process a URL first'}), 400
     
+    user_turn = {
+        "user_id": current_user_id,
+        "message": user_message,
+        "role": "user",
+        "context": model.context
+    }
+    
+    start_time = time.time()
     try:
-        start_time = time.time()
-        
-        # Save user message to database
-        save_chat_message(
-            current_user_id,
-            user_message,
-            "user",
-            model.context
-        )
-        
-        # Generate response
-        response = model.generate_response(
+        # Generate response on the shared event loop with the async Groq client
+        response = run_async(model.agenerate_response(
             user_message,
             temperature,
             max_tokens,
             model_id,
             use_summary=use_summary
-        )
-        
-        # Save assistant response to database
-        save_chat_message(
-            current_user_id,
-            response,
-            "assistant",
-            model.context
-        )
-        
-        # Record metrics
-        user_session['metrics'].record_request(
-            success=True,
-            response_time=time.time() - start_time,
-            tokens_used=len(response.split())
-        )
-        
-        return jsonify({
-            'success': True, 
-            'response': response,
-        })
-        
+        ))
     except Exception as e:
+        logger.exception("Response generation failed")
+        queue_chat_messages([user_turn])
         user_session['metrics'].record_request(
             success=False,
             response_time=time.time() - start_time,
             tokens_used=0
         )
         return jsonify({'success': False, 'message': f"Error generating response: {str(e)}"}), 500
+    
+    # Save both turns in the background so the reply isn't held up by the database
+    queue_chat_messages([user_turn, {
+        "user_id": current_user_id,
+        "message": response,
+        "role": "assistant",
+        "context": model.context
+    }])
+    
+    # Record metrics
+    user_session['metrics'].record_request(
+        success=True,
+        response_time=time.time() - start_time,
+        tokens_used=approximate_token_count(response)
+    )
+    
+    return jsonify({
+        'success': True, 
+        'response': response,
+    })
 
 # ----- HISTORY MANAGEMENT ENDPOINTS -----
 
@@ -381,7 +1062,8 @@ def get_history(current_user_id):
     """
     Chat history retrieval endpoint.
     
-    Fetches the user's chat history from the database.
+    Fetches the user's chat history from the database, serving repeat requests
+    from a short-lived per-user cache until the history changes.
     
     Args:
         current_user_id: User ID from the authentication decorator
@@ -389,19 +1071,23 @@ def get_history(current_user_id):
     Returns:
         JSON with chat messages array or error message
     """
-    try:
-        # Load chat history from database
-        history = get_chat_history(current_user_id)
-        messages = [{
-            "role": msg.role,
-            "content": msg.message,
-            "timestamp": msg.timestamp
-        } for msg in history]
-        
-        return jsonify({'success': True, 'messages': messages})
-        
-    except Exception as e:
-        return jsonify({'success': False, 'message': f"Error fetching history: {str(e)}"}), 500
+    body = _get_cached_history(current_user_id)
+    if body is not None:
+        return app.response_class(body, mimetype='application/json')
+    
+    # Load chat history from database
+    flush_chat_writes(current_user_id)
+    generation = _history_generation(current_user_id)
+    history = get_chat_history(current_user_id)
+    messages = [{
+        "role": msg.role,
+        "content": msg.message,
+        "timestamp": msg.timestamp
+    } for msg in history]
+    
+    response = jsonify({'success': True, 'messages': messages})
+    _cache_history(current_user_id, response.get_data(), generation)
+    return response
 
 @app.route('/api/chat/clear', methods=['POST'])
 @token_required
@@ -417,13 +1103,11 @@ def clear_history(current_user_id):
     Returns:
         JSON indicating success/failure
     """
-    try:
-        delete_user_chat_history(current_user_id)
-        user_sessions[current_user_id]['url_processed'] = False
-        return jsonify({'success': True, 'message': 'Chat history cleared'})
-        
-    except Exception as e:
-        return jsonify({'success': False, 'message': f"Error clearing history: {str(e)}"}), 500
+    flush_chat_writes(current_user_id)
+    delete_user_chat_history(current_user_id)
+    invalidate_history_cache(current_user_id)
+    set_url_processed(current_user_id, False)
+    return jsonify({'success': True, 'message': 'Chat history cleared'})
 
 @app.route('/api/chat/restore', methods=['POST'])
 @token_required
@@ -432,7 +1116,7 @@ def restore_history(current_user_id):
     Chat history and context restoration endpoint.
     
     Rebuilds the model's internal state from previously saved chat history.
-    Reconstructs vector database from context for retrieval.
+    Reloads the vector database from the stored chunks for retrieval.
     
     Args:
         current_user_id: User ID from the authentication decorator
@@ -440,34 +1124,43 @@ def restore_history(current_user_id):
     Returns:
         JSON indicating success/failure
     """
-    try:
-        user_session = user_sessions[current_user_id]
-        model = user_session['model']
-        
-        # Clear existing model state
-        model.clear()
-        
-        # Load messages
-        messages = restore_chat_history(current_user_id)
-        
-        # Rebuild model context from chat history
-        context_parts = [
-            msg.get('context') for msg in messages 
-            if msg.get('context')
-        ]
-        model.context = "\n".join(context_parts)
-        
-        # Rebuild vector database from context
-        if model.context:
-            chunks = model.chunk_text(model.context)
-            summaries = [model.summarizer.generate_summary(chunk) for chunk in chunks]
-            model.database.add_data(chunks, summaries)
-            user_session['url_processed'] = True
-            
-        return jsonify({'success': True, 'message': 'Full conversation state restored'})
+    user_session = user_sessions[current_user_id]
+    model = user_session['model']
+    
+    # Clear existing model state
+    model.clear()
+    
+    # Load messages
+    flush_chat_writes(current_user_id)
+    messages = restore_chat_history(current_user_id)
+    
+    # Rebuild model context from chat history; every turn stores the context it was
+    # answered with, so keep each distinct context once, in first-seen order
+    context_parts = dict.fromkeys(
+        msg.get('context') for msg in messages 
+        if msg.get('context')
+    )
+    model.context = "\n".join(context_parts)
+    
+    # Reload the stored chunks verbatim; histories saved before chunks were
+    # persisted are re-chunked from the context once and stored for next time
+    chunks, summaries, embeddings = get_vector_chunks(current_user_id, model.database.index.d)
+    if chunks:
+        model.database.add_data(chunks, summaries, embeddings)
+        set_url_processed(current_user_id, True)
+    elif model.context:
+        chunks = list(dict.fromkeys(model.chunk_text(model.context)))
+        try:
+            # Summarize all chunks concurrently on the shared event loop
+            summaries = run_async(model.summarizer.agenerate_summaries(chunks))
+        except Exception as e:
+            logger.exception("Summarizing restored history failed")
+            return jsonify({'success': False, 'message': f"Restoration failed: {str(e)}"}), 500
+        model.database.add_data(chunks, summaries)
+        save_vector_chunks(current_user_id, *model.database.records_since(0))
+        set_url_processed(current_user_id, True)
         
-    except Exception as e:
-        return jsonify({'success': False, 'message': f"Restoration failed: {str(e)}"}), 500
+    return jsonify({'success': True, 'message': 'Full conversation state restored'})
 
 # ----- METRICS AND DATA MANAGEMENT ENDPOINTS -----
 
@@ -485,13 +1178,12 @@ def get_metrics(current_user_id):
     Returns:
         JSON with metrics data or error message
     """
-    try:
-        user_session = user_sessions[current_user_id]
-        metrics = user_session['metrics'].metrics.to_dict()
-        return jsonify({'success': True, 'metrics': metrics})
-        
-    except Exception as e:
-        return jsonify({'success': False, 'message': f"Error fetching metrics: {str(e)}"}), 500
+    user_session = user_sessions[current_user_id]
+    metrics = user_session['metrics'].metrics.to_dict()
+    response = jsonify({'success': True, 'metrics': metrics})
+    # Let polling dashboards reuse a response for a second instead of refetching
+    response.headers['Cache-Control'] = 'private, max-age=1'
+    return response
 
 @app.route('/api/export', methods=['GET'])
 @token_required
@@ -508,28 +1200,42 @@ def export_data(current_user_id):
     Returns:
         JSON with complete application state or error message
     """
-    try:
-        user_session = user_sessions[current_user_id]
-        model = user_session['model']
-        
-        history = get_chat_history(current_user_id)
-        messages = [{
+    user_session = user_sessions[current_user_id]
+    model = user_session['model']
+    metrics = user_session['metrics'].metrics.to_dict()
+    flush_chat_writes(current_user_id)
+    
+    def array_items(batches):
+        # Each batch is dumped as a JSON array; dropping its brackets lets
+        # consecutive batches join into a single array
+        for i, batch in enumerate(batches):
+            yield ("," if i else "") + app.json.dumps(batch)[1:-1]
+    
+    def generate():
+        # Same document jsonify would produce ({"data": {...}, "success": true}, keys
+        # sorted), written a batch of rows at a time so history and embeddings are
+        # never all held in memory at once
+        messages = ({
             "role": msg.role,
             "content": msg.message,
             "context": msg.context,
             "timestamp": msg.timestamp
-        } for msg in history]
-        
-        export_data = {
-            "metrics": user_session['metrics'].metrics.to_dict(),
-            "vector_database": model.database.to_dict(),
-            "messages": messages
-        }
-        
-        return jsonify({'success': True, 'data': export_data})
+        } for msg in iter_chat_history(current_user_id, batch_size=EXPORT_BATCH_SIZE))
+        records = (
+            {"text": text, "summary": summary}
+            for text, summary in zip(model.database.texts, model.database.summaries)
+        )
         
-    except Exception as e:
-        return jsonify({'success': False, 'message': f"Export failed: {str(e)}"}), 500
+        yield '{"data":{"messages":['
+        yield from array_items(_batched(messages, EXPORT_BATCH_SIZE))
+        yield '],"metrics":' + app.json.dumps(metrics) + ',"vector_database":{"data":['
+        yield from array_items(_batched(records, EXPORT_BATCH_SIZE))
+        yield '],"index":['
+        # tolist() as in to_dict, so floats keep the float64 form clients already receive
+        yield from array_items(block.tolist() for block in model.database.iter_embeddings(EXPORT_BATCH_SIZE))
+        yield ']}},"success":true}\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/json')
 
 @app.route('/api/import', methods=['POST'])
 @token_required
@@ -546,50 +1252,46 @@ def import_data(current_user_id):
     Returns:
         JSON indicating success/failure
     """
+    user_session = user_sessions[current_user_id]
+    model = user_session['model']
+    
+    body = request.get_json(silent=True, cache=False)
+    imported_data = body.get('data') if isinstance(body, dict) else None
+    if not imported_data:
+        return jsonify({'success': False, 'message': 'No data provided'}), 400
+        
+    # Validate imported data structure
     try:
-        user_session = user_sessions[current_user_id]
-        model = user_session['model']
+        validate_import_data(imported_data)
+    except fastjsonschema.JsonSchemaException as e:
+        return jsonify({'success': False, 'message': f"Invalid backup file structure: {e.message}"}), 400
         
-        imported_data = request.json.get('data')
-        if not imported_data:
-            return jsonify({'success': False, 'message': 'No data provided'}), 400
-            
-        # Validate imported data structure
-        required_keys = ["metrics", "vector_database", "messages"]
-        if not all(key in imported_data for key in required_keys):
-            return jsonify({'success': False, 'message': 'Invalid backup file structure'}), 400
-            
-        # Import data with proper state management
+    # Import data with proper state management; the schema doesn't check that
+    # embeddings are well-formed or match the model's dimension
+    try:
         model.import_state(imported_data)
-        
-        # Delete existing chat history
-        delete_user_chat_history(current_user_id)
-        
-        # Restore chat history and context from imported data
-        if "messages" in imported_data:
-            for msg in imported_data["messages"]:
-                save_chat_message(
-                    current_user_id,
-                    msg["content"],
-                    msg["role"],
-                    msg.get("context", "")
-                )
-                
-        # Set URL processed state if there's context
-        if model.context:
-            user_session['url_processed'] = True
-        else:
-            user_session['url_processed'] = False
-            
-        # Update metrics
-        if "metrics" in imported_data:
-            user_session['metrics'] = MetricsCollector()
-            user_session['metrics'].metrics = Metrics.from_dict(imported_data["metrics"])
+    except (KeyError, TypeError, ValueError) as e:
+        logger.warning(f"Rejected import for user {current_user_id}: {e!r}")
+        return jsonify({'success': False, 'message': f"Import failed: {str(e)}"}), 400
+    
+    # Replace existing chat history with the imported messages in one transaction
+    flush_chat_writes(current_user_id)
+    replace_chat_history(current_user_id, [{
+        "message": msg["content"],
+        "role": msg["role"],
+        "context": msg.get("context", "")
+    } for msg in imported_data["messages"]])
+    invalidate_history_cache(current_user_id)
             
-        return jsonify({'success': True, 'message': 'Data imported successfully'})
+    # Set URL processed state if there's context
+    set_url_processed(current_user_id, bool(model.context))
         
-    except Exception as e:
-        return jsonify({'success': False, 'message': f"Import failed: {str(e)}"}), 500
+    # Update metrics
+    if "metrics" in imported_data:
+        user_session['metrics'] = MetricsCollector()
+        user_session['metrics'].metrics = Metrics.from_dict(imported_data["metrics"])
+        
+    return jsonify({'success': True, 'message': 'Data imported successfully'})
 
 # ----- SETTINGS AND CONFIGURATION ENDPOINTS -----
 
@@ -607,18 +1309,14 @@ def update_settings(current_user_id):
     Returns:
         JSON indicating success/failure
     """
-    data = request.json
+    data = request.get_json(silent=True, cache=False) or {}
     user_session = user_sessions[current_user_id]
     
-    try:
-        # Update any settings passed in the request
-        if 'use_summary' in data:
-            user_session['use_summary'] = data['use_summary']
-            
-        return jsonify({'success': True, 'message': 'Settings updated'})
+    # Update any settings passed in the request
+    if 'use_summary' in data:
+        user_session['use_summary'] = data['use_summary']
         
-    except Exception as e:
-        return jsonify({'success': False, 'message': f"Error updating settings: {str(e)}"}), 500
+    return jsonify({'success': True, 'message': 'Settings updated'})
 
 @app.route('/api/clear-all', methods=['POST'])
 @token_required
@@ -634,20 +1332,22 @@ def clear_all_data(current_user_id):
     Returns:
         JSON indicating success/failure
     """
-    try:
-        user_session = user_sessions[current_user_id]
-        model = user_session['model']
-        
-        model.clear()
-        delete_user_chat_history(current_user_id)
-        user_session['url_processed'] = False
-        user_session['metrics'] = MetricsCollector()
-        
-        return jsonify({'success': True, 'message': 'All data cleared successfully'})
-        
-    except Exception as e:
-        return jsonify({'success': False, 'message': f"Error clearing data: {str(e)}"}), 500
+    user_session = user_sessions[current_user_id]
+    model = user_session['model']
+    
+    model.clear()
+    flush_chat_writes(current_user_id)
+    delete_user_chat_history(current_user_id)
+    invalidate_history_cache(current_user_id)
+    set_url_processed(current_user_id, False)
+    user_session['metrics'] = MetricsCollector()
+    
+    return jsonify({'success': True, 'message': 'All data cleared successfully'})
 
 if __name__ == '__main__':
+    from werkzeug.serving import WSGIRequestHandler
+    
+    # Speak HTTP/1.1 so clients can keep connections alive between API calls
+    WSGIRequestHandler.protocol_version = "HTTP/1.1"
     # Run the Flask application in debug mode (not for production)
     app.run(debug=True)
\ No newline at end of file
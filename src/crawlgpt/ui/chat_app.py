@@ -2,16 +2,21 @@
 # Description: Streamlit app for the chat interface of the CrawlGPT system with user authentication
 import streamlit as st
 import asyncio
+import os
+import threading
+from concurrent.futures import Future
+from typing import AsyncIterator
 import time
 from datetime import datetime
-import json
+import orjson
 from src.crawlgpt.core.LLMBasedCrawler import Model
-from src.crawlgpt.core.database import save_chat_message, get_chat_history, delete_user_chat_history, restore_chat_history
-from src.crawlgpt.utils.monitoring import MetricsCollector, Metrics
+from src.crawlgpt.core.database import save_chat_messages, get_chat_history, delete_user_chat_history, restore_chat_history, save_vector_chunks, save_missing_vector_chunks, get_vector_chunks
+from src.crawlgpt.utils.monitoring import MetricsCollector, Metrics, approximate_token_count
 from src.crawlgpt.utils.progress import ProgressTracker
 from src.crawlgpt.utils.data_manager import DataManager
 from src.crawlgpt.utils.content_validator import ContentValidator
 from src.crawlgpt.ui.login import show_login
+from src.crawlgpt.utils.helper_functions import show_progress
 
 # Check authentication before any other processing
 if 'user' not in st.session_state:
@@ -32,12 +37,84 @@ st.write(
     "It also summarizes extracted content for efficient retrieval."
 )
 
-# Initialize components in session state
+@st.cache_resource
+def _history_versions():
+    """Process-wide per-user counters, bumped whenever a user's saved history changes"""
+    return {}
+
+def bump_history_version(user_id: int):
+    """Marks a user's cached chat history as stale after writing to it"""
+    versions = _history_versions()
+    versions[user_id] = versions.get(user_id, 0) + 1
+
+@st.cache_data(show_spinner=False, ttl=3600)
+def load_history_messages(user_id: int, version: int):
+    """
+    Loads a user's chat history as message dicts, cached per history version.
+    
+    Args:
+        user_id (int): ID of the user
+        version (int): Current history version of the user, so writes invalidate the cache
+        
+    Returns:
+        List[Dict]: Messages with role, content, context and timestamp
+    """
+    return [{
+        "role": msg.role,
+        "content": msg.message,
+        "context": msg.context,
+        "timestamp": msg.timestamp
+    } for msg in get_chat_history(user_id)]
+
+@st.cache_resource
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Process-wide event loop running in a background thread.
+    
+    Crawls and batch summaries for every session run here instead of on a loop
+    built and torn down per click, so the shared browser and async Groq client
+    stay alive between requests.
+    """
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="crawlgpt-event-loop", daemon=True).start()
+    return loop
+
+def submit_async(coro) -> Future:
+    """Schedules a coroutine on the shared event loop and returns its future"""
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop())
+
+def iterate_async(agen: AsyncIterator):
+    """Iterates an async generator running on the shared event loop from the script thread"""
+    try:
+        while True:
+            try:
+                yield submit_async(agen.__anext__()).result()
+            except StopAsyncIteration:
+                return
+    finally:
+        submit_async(agen.aclose()).result()
+
+# Backups written for download are deleted after this many seconds
+EXPORT_MAX_AGE = 30 * 60
+
+@st.cache_resource
+def get_data_manager() -> DataManager:
+    """Process-wide DataManager; it holds no per-user state"""
+    return DataManager()
+
+@st.cache_resource
+def get_content_validator() -> ContentValidator:
+    """Process-wide ContentValidator; it holds no per-user state"""
+    return ContentValidator()
+
+# Initialize components in session state. Each session keeps its own Model, since
+# it holds that user's context and vector database; the embedding model and Groq
+# clients inside it are already shared across the process.
 if "model" not in st.session_state:
-    st.session_state.model = Model()
-    st.session_state.data_manager = DataManager()
-    st.session_state.content_validator = ContentValidator()
-    st.session_state.messages = []
+    # Crawls share one browser on the shared event loop, each in a page of its own
+    st.session_state.model = Model(shared_crawler=True)
+    st.session_state.data_manager = get_data_manager()
+    st.session_state.content_validator = get_content_validator()
     st.session_state.url_processed = False
 
 if "use_summary" not in st.session_state:
@@ -48,15 +125,8 @@ if "metrics" not in st.session_state:
 
 # Load chat history from database
 if "messages" not in st.session_state:
-    st.session_state.messages = []
-    # Load user's chat history from database
-    history = get_chat_history(st.session_state.user.id)
-    st.session_state.messages = [{
-        "role": msg.role,
-        "content": msg.message,
-        "context": msg.context,
-        "timestamp": msg.timestamp
-    } for msg in history]
+    user_id = st.session_state.user.id
+    st.session_state.messages = load_history_messages(user_id, _history_versions().get(user_id, 0))
 
 model = st.session_state.model
 
@@ -69,18 +139,27 @@ def load_chat_history():
         # Load messages
         st.session_state.messages = restore_chat_history(st.session_state.user.id)
         
-        # Rebuild model context from chat history
-        context_parts = [
+        # Rebuild model context from chat history; every turn stores the context it was
+        # answered with, so keep each distinct context once, in first-seen order
+        context_parts = dict.fromkeys(
             msg['context'] for msg in st.session_state.messages 
             if msg.get('context')
-        ]
+        )
         model.context = "\n".join(context_parts)
         
-        # Rebuild vector database from context
-        if model.context:
-            chunks = model.chunk_text(model.context)
-            summaries = [model.summarizer.generate_summary(chunk) for chunk in chunks]
+        # Reload the stored chunks verbatim; histories saved before chunks were
+        # persisted are re-chunked from the context once and stored for next time
+        user_id = st.session_state.user.id
+        chunks, summaries, embeddings = get_vector_chunks(user_id, model.database.index.d)
+        if chunks:
+            model.database.add_data(chunks, summaries, embeddings)
+            st.session_state.url_processed = True
+        elif model.context:
+            chunks = list(dict.fromkeys(model.chunk_text(model.context)))
+            # Summarize all chunks concurrently instead of one request at a time
+            summaries = submit_async(model.summarizer.agenerate_summaries(chunks)).result()
             model.database.add_data(chunks, summaries)
+            save_vector_chunks(user_id, *model.database.records_since(0))
             st.session_state.url_processed = True
             
         st.rerun()
@@ -115,24 +194,33 @@ with st.sidebar:
                 "vector_database": model.database.to_dict(),
                 "messages": st.session_state.messages
             }
-            export_json = json.dumps(export_data)
-            st.session_state.export_json = export_json
+            # Keep the backup on disk and only its path in the session, so it
+            # doesn't stay in memory for as long as the session lives
+            data_manager = st.session_state.data_manager
+            data_manager.cleanup_exports("backup", max_age=EXPORT_MAX_AGE)
+            st.session_state.export_path = data_manager.export_data(export_data, "backup")
             st.success("Data exported successfully!")
         except Exception as e:
             st.error(f"Export failed: {e}")
 
-    if "export_json" in st.session_state:
-        st.download_button(
-            label="Download Backup",
-            data=st.session_state.export_json,
-            file_name=f"crawlgpt_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-            mime="application/json"
-        )
+    export_path = st.session_state.get("export_path")
+    if export_path and os.path.exists(export_path):
+        with open(export_path, "rb") as f:
+            st.download_button(
+                label="Download Backup",
+                data=f,
+                file_name=f"crawlgpt_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+                mime="application/json"
+            )
+    elif export_path:
+        # Removed by the export cleanup; export again to download
+        del st.session_state.export_path
 
     uploaded_file = st.file_uploader("Import Previous State", type=['json'])
     if uploaded_file is not None:
         try:
-            imported_data = json.loads(uploaded_file.read())
+            # getvalue() returns the upload's buffer without another read; orjson parses bytes directly
+            imported_data = orjson.loads(uploaded_file.getvalue())
             
             # Validate imported data structure
             required_keys = ["metrics", "vector_database", "messages"]
@@ -181,124 +269,119 @@ if process_url and url:
     if not url.strip():
         st.warning("Please enter a valid URL.")
     else:
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        
         try:
             if not st.session_state.content_validator.is_valid_url(url):
                 st.error("Invalid URL format")
             else:
-                async def extract_content():
-                    start_time = time.time()
-                    progress = ProgressTracker(total_steps=4, operation_name="content_extraction")
+                start_time = time.time()
+                # The model reports steps 1-5 while crawling and processing; the bar
+                # only fills up once extraction has completed
+                progress = ProgressTracker(total_steps=6, operation_name="content_extraction")
+                
+                try:
+                    success, msg = show_progress(progress, submit_async(
+                        model.extract_content_from_url(url, session_id=None, progress=progress)
+                    ))
                     
-                    try:
-                        status_text.text("Validating URL...")
-                        progress_bar.progress(25)
-                        
-                        status_text.text("Crawling content...")
-                        progress_bar.progress(50)
-                        success, msg = await model.extract_content_from_url(url)
-                        
-                        if success:
-                            status_text.text("Processing content...")
-                            progress_bar.progress(75)
-                            
-                            status_text.text("Storing in database...")
-                            progress_bar.progress(100)
-                            
-                            st.session_state.metrics.record_request(
-                                success=True,
-                                response_time=time.time() - start_time,
-                                tokens_used=len(model.context.split())
-                            )
-                            
-                            st.session_state.url_processed = True
-                            st.session_state.messages.append({
-                                                                "role": "system",
-                                                                "content": f"Content from {url} processed",
-                                                                "context": model.context  # Store full context
-                                                            })
-                        else:
-                            raise Exception(msg)
-                            
-                    except Exception as e:
+                    if success:
+                        # Persist the chunks so a restore can reload them as-is
+                        save_missing_vector_chunks(
+                            st.session_state.user.id,
+                            *model.database.records_since(0)
+                        )
                         st.session_state.metrics.record_request(
-                            success=False,
+                            success=True,
                             response_time=time.time() - start_time,
-                            tokens_used=0
+                            tokens_used=model.context_token_count
                         )
-                        raise e
-                    finally:
-                        status_text.empty()
-                        progress_bar.empty()
-
-                asyncio.run(extract_content())
+                        
+                        st.session_state.url_processed = True
+                        st.session_state.messages.append({
+                                                            "role": "system",
+                                                            "content": f"Content from {url} processed",
+                                                            "context": model.context  # Store full context
+                                                        })
+                    else:
+                        raise Exception(msg)
+                        
+                except Exception as e:
+                    st.session_state.metrics.record_request(
+                        success=False,
+                        response_time=time.time() - start_time,
+                        tokens_used=0
+                    )
+                    raise e
                 
         except Exception as e:
             st.error(f"Error processing URL: {e}")
 
 # Chat Interface
-st.subheader("💭 Chat Interface")
-
-# Display chat messages
-chat_container = st.container()
-with chat_container:
-    for message in st.session_state.messages:
-        with st.chat_message(message["role"]):
-            st.write(message["content"])
-
-# Chat input
-if chat_input := st.chat_input("Ask about the content...", disabled=not st.session_state.url_processed):
-    # Display user message
-    with st.chat_message("user"):
-        st.write(chat_input)
-    
-    # Add user message to history and database
-    st.session_state.messages.append({"role": "user", "content": chat_input})
-    save_chat_message(
-        st.session_state.user.id,
-        chat_input,
-        "user",
-        model.context  # Store full context
-    )
-    try:
-        start_time = time.time()
-        
-        # Show typing indicator
-        with st.chat_message("assistant"):
-            with st.spinner("Thinking..."):
-                response = model.generate_response(
+@st.fragment
+def chat_panel(temperature: float, max_tokens: int, model_id: str):
+    """Chat history and input; sending a message reruns only this panel, not the sidebar or URL section"""
+    st.subheader("💭 Chat Interface")
+
+    # Display chat messages
+    chat_container = st.container()
+    with chat_container:
+        for message in st.session_state.messages:
+            with st.chat_message(message["role"]):
+                st.write(message["content"])
+
+    # Chat input
+    if chat_input := st.chat_input("Ask about the content...", disabled=not st.session_state.url_processed):
+        # Display user message
+        with st.chat_message("user"):
+            st.write(chat_input)
+
+        # Add user message to history; it is saved to the database together with the response
+        st.session_state.messages.append({"role": "user", "content": chat_input})
+        user_turn = {
+            "user_id": st.session_state.user.id,
+            "message": chat_input,
+            "role": "user",
+            "context": model.context  # Store full context
+        }
+        try:
+            start_time = time.time()
+
+            # Show the answer as it is generated instead of waiting for all of it
+            with st.chat_message("assistant"):
+                response = st.write_stream(iterate_async(model.generate_response_stream(
                     chat_input,
                     temperature,
                     max_tokens,
                     model_id,
                     use_summary=st.session_state.use_summary
-                )
-                st.write(response)
-        
-        # Add assistant response to history and database
-        st.session_state.messages.append({"role": "assistant", "content": response})
-        save_chat_message(
-            st.session_state.user.id,
-            response,  # Fixed: Save the assistant's response
-            "assistant",  # Fixed: Correct role
-            model.context
-        )
-        # Record metrics
-        st.session_state.metrics.record_request(
-            success=True,
-            response_time=time.time() - start_time,
-            tokens_used=len(response.split())
-        )
+                )))
 
-    except Exception as e:
-        st.session_state.metrics.record_request(
-            success=False,
-            response_time=time.time() - start_time,
-            tokens_used=0
-        )
-        st.error(f"Error generating response: {e}")
+            # Add assistant response to history and save both turns to database
+            st.session_state.messages.append({"role": "assistant", "content": response})
+            save_chat_messages([user_turn, {
+                "user_id": st.session_state.user.id,
+                "message": response,
+                "role": "assistant",
+                "context": model.context
+            }])
+            bump_history_version(st.session_state.user.id)
+            # Record metrics
+            st.session_state.metrics.record_request(
+                success=True,
+                response_time=time.time() - start_time,
+                tokens_used=approximate_token_count(response)
+            )
+
+        except Exception as e:
+            save_chat_messages([user_turn])
+            bump_history_version(st.session_state.user.id)
+            st.session_state.metrics.record_request(
+                success=False,
+                response_time=time.time() - start_time,
+                tokens_used=0
+            )
+            st.error(f"Error generating response: {e}")
+
+chat_panel(temperature, max_tokens, model_id)
 
 # Debug and Clear Options
 col1, col2 = st.columns(2)
@@ -306,6 +389,7 @@ with col1:
     if st.button("Clear Chat History"):
         try:
             delete_user_chat_history(st.session_state.user.id)
+            bump_history_version(st.session_state.user.id)
             st.session_state.messages = []
             st.session_state.url_processed = False
             st.success("Chat history cleared!")
@@ -320,6 +404,7 @@ with col2:
                 model.clear()
                 st.session_state.messages = []
                 delete_user_chat_history(st.session_state.user.id)
+                bump_history_version(st.session_state.user.id)
                 st.session_state.url_processed = False
                 st.session_state.metrics = MetricsCollector()
                 st.success("All data cleared successfully.")
@@ -6,7 +6,7 @@ import asyncio
 import time
 from datetime import datetime
 from src.crawlgpt.core.LLMBasedCrawler import Model
-from src.crawlgpt.utils.monitoring import MetricsCollector, Metrics
+from src.crawlgpt.utils.monitoring import MetricsCollector, Metrics, approximate_token_count
 from src.crawlgpt.utils.progress import ProgressTracker
 from src.crawlgpt.utils.data_manager import DataManager
 from src.crawlgpt.utils.content_validator import ContentValidator
@@ -120,7 +120,7 @@ if st.button("Extract and Store Content"):
                         st.session_state.metrics.record_request(
                             success=True,
                             response_time=time.time() - start_time,
-                            tokens_used=len(model.context.split())
+                            tokens_used=model.context_token_count
                         )
                         
                         st.success("Content extracted and stored successfully.")
@@ -135,6 +135,7 @@ if st.button("Extract and Store Content"):
                         )
                         raise e
                     finally:
+                        await model.aclose()
                         status_text.empty()
                         progress_bar.empty()
 
@@ -183,7 +184,7 @@ if st.button("Get Response"):
             st.session_state.metrics.record_request(
                 success=True,
                 response_time=time.time() - start_time,
-                tokens_used=len(response.split())
+                tokens_used=approximate_token_count(response)
             )
             
             st.write("Generated Response:")
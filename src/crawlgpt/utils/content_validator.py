@@ -1,8 +1,22 @@
 from typing import List, Dict, Optional, Any
+from functools import lru_cache
 import re
 from urllib.parse import urlparse
 from mimetypes import guess_type
 
+# Compiled once at import instead of looked up in re's cache on every call
+_SCRIPT_TAG_RE = re.compile(r"<script.*?>", re.I)
+
+@lru_cache(maxsize=8192)
+def _is_well_formed_url(url: str) -> bool:
+    """Parse a URL once and remember whether it has a scheme and a host."""
+    try:
+        result = urlparse(url)
+    except (ValueError, AttributeError):
+        # Malformed host or port, or not a string at all
+        return False
+    return bool(result.scheme and result.netloc)
+
 class ContentValidator:
     """
     A validator class for content and URLs in the web crawler.
@@ -49,9 +63,9 @@ class ContentValidator:
             False
         """
         try:
-            result = urlparse(url)
-            return all([result.scheme, result.netloc])
-        except:
+            return _is_well_formed_url(url)
+        except TypeError:
+            # Unhashable input can't be a URL
             return False
     
     def is_allowed_content_type(self, content_type: str) -> bool:
@@ -110,7 +124,7 @@ class ContentValidator:
             {'valid': False, 'reason': 'Contains script tags'}
         """
         # Check for potentially malicious content
-        if re.search(r"<script.*?>", content, re.I):
+        if _SCRIPT_TAG_RE.search(content):
             return {"valid": False, "reason": "Contains script tags"}
             
         # Check for minimum content length
@@ -1,15 +1,18 @@
-import json
+import orjson
 import pickle
 from typing import Dict, Any, List
 import os
+import time
+import uuid
 from datetime import datetime
 
 class DataManager:
     """
     Handles data import/export operations for the application.
     
-    This class manages serialization and deserialization of data to/from files,
-    supporting both JSON and pickle formats for different data types.
+    This class manages serialization and deserialization of data to/from files.
+    Data is written as JSON; pickle exports from earlier versions can still be
+    imported.
     
     Attributes:
         export_dir (str): Directory where exported files are stored
@@ -37,7 +40,7 @@ class DataManager:
         
         Args:
             data (Dict[str, Any]): Data to export
-            data_type (str): Type of data ('vector_database' or other)
+            data_type (str): Type of data, used as the file name prefix
         
         Returns:
             str: Path to the exported file
@@ -46,21 +49,19 @@ class DataManager:
             >>> data = {"metrics": {"requests": 100}}
             >>> filepath = data_manager.export_data(data, "metrics")
             >>> print(filepath)
-            'exports/metrics_20240123_123456.json'
+            'exports/metrics_20240123_123456_1a2b3c4d.json'
         """
         timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-        filename = f"{data_type}_{timestamp}"
+        # The suffix keeps concurrent exports of the same type from overwriting each other
+        filename = f"{data_type}_{timestamp}_{uuid.uuid4().hex[:8]}"
         
-        if data_type == "vector_database":
-            # Export vector database
-            filepath = os.path.join(self.export_dir, f"{filename}.pkl")
-            with open(filepath, "wb") as f:
-                pickle.dump(data, f)
-        else:
-            # Export other data as JSON
-            filepath = os.path.join(self.export_dir, f"{filename}.json")
-            with open(filepath, "w") as f:
-                json.dump(data, f, indent=2)
+        # Encoded straight to bytes by orjson
+        filepath = os.path.join(self.export_dir, f"{filename}.json")
+        with open(filepath, "wb") as f:
+            f.write(orjson.dumps(
+                data,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            ))
                 
         return filepath
     
@@ -75,13 +76,42 @@ class DataManager:
             Dict[str, Any]: Imported data
 
         Examples:
-            >>> imported_data = data_manager.import_data("exports/metrics_20240123_123456.json")
+            >>> imported_data = data_manager.import_data("exports/metrics_20240123_123456_1a2b3c4d.json")
             >>> print(imported_data)
             {'metrics': {'requests': 100}}
         """
         if filepath.endswith('.pkl'):
             with open(filepath, "rb") as f:
                 return pickle.load(f)
-        else:
-            with open(filepath, "r") as f:
-                return json.load(f)
\ No newline at end of file
+        with open(filepath, "rb") as f:
+            return orjson.loads(f.read())
+
+    def cleanup_exports(self, data_type: str, max_age: float) -> int:
+        """
+        Delete exports of a type that are older than max_age.
+        
+        Args:
+            data_type (str): Type the files were exported as
+            max_age (float): Maximum age in seconds, measured from last modification
+        
+        Returns:
+            int: Number of files deleted
+
+        Examples:
+            >>> data_manager.cleanup_exports("backup", max_age=1800)
+            2
+        """
+        cutoff = time.time() - max_age
+        deleted = 0
+        with os.scandir(self.export_dir) as entries:
+            for entry in entries:
+                if not entry.name.startswith(f"{data_type}_") or not entry.is_file():
+                    continue
+                try:
+                    if entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                        deleted += 1
+                except FileNotFoundError:
+                    # Removed concurrently by another session
+                    continue
+        return deleted
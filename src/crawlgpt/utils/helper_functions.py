@@ -1,8 +1,9 @@
 import streamlit as st
 import json
-import time
 from datetime import datetime
+from concurrent.futures import Future, TimeoutError
 from typing import Tuple, Dict
+from src.crawlgpt.utils.progress import ProgressTracker
 
 # Constants
 BACKUP_VERSION = "1.0"
@@ -29,15 +30,8 @@ def validate_export_state() -> bool:
         if not hasattr(st.session_state.model, 'database'):
             return False
             
-        # Check if database has data by checking if it's empty
-        database_dict = st.session_state.model.database.to_dict()
-        if not database_dict:
-            return False
-            
-        # Additional validation to ensure data structure
-        if isinstance(database_dict, (list, dict)):
-            return bool(len(database_dict) > 0)
-        return False
+        # Check if database has data without serializing it
+        return not st.session_state.model.database.is_empty()
     except Exception as e:
         st.error(f"Error validating export state: {str(e)}")
         return False
@@ -91,22 +85,27 @@ def check_file_size(file_content: str) -> bool:
     except Exception:
         return False
 
-def show_progress_bar(message: str):
-    """Show a progress bar with a message"""
+def show_progress(tracker: ProgressTracker, future: Future, poll_interval: float = 0.1):
+    """Wait for a future, redrawing a progress bar from its tracker on the script thread"""
+    progress_bar = st.progress(0, text=tracker.message)
+    shown = None
     try:
-        progress_bar = st.progress(0)
-        for i in range(100):
-            progress_bar.progress(i + 1)
-            time.sleep(0.01)
+        while True:
+            state = (int(tracker.progress), tracker.message)
+            if state != shown:
+                progress_bar.progress(state[0], text=state[1])
+                shown = state
+            try:
+                return future.result(timeout=poll_interval)
+            except TimeoutError:
+                continue
+    finally:
         progress_bar.empty()
-    except Exception:
-        pass  # Silently fail if progress bar fails
 
 def check_model_state() -> bool:
     """Check if the model has data loaded either from URL or import"""
     try:
-        database_dict = st.session_state.model.database.to_dict()
-        has_data = bool(database_dict and len(database_dict) > 0)
+        has_data = not st.session_state.model.database.is_empty()
         if has_data:
             st.session_state.url_processed = True
         return st.session_state.url_processed
@@ -3,8 +3,51 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import time
 from collections import deque
+from functools import lru_cache
 import logging
 
+logger = logging.getLogger(__name__)
+
+try:
+    # Optional: real BPE token counts for usage metrics
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    """Loads the tiktoken encoding once per process, or None if it can't be loaded."""
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        # The encoding is downloaded on first use, which fails offline
+        logger.warning(f"tiktoken encoding unavailable, estimating tokens from whitespace: {str(e)}")
+        return None
+
+def approximate_token_count(text: str) -> int:
+    """
+    Estimates the token count of a text for usage metrics.
+    
+    With tiktoken installed the text is encoded with the cl100k_base BPE, which
+    tracks LLM tokenizers closely for code and non-English text. Otherwise space
+    and newline separators are counted rather than splitting, so no list of
+    substrings is built.
+    
+    Args:
+        text (str): Text to measure
+        
+    Returns:
+        int: Approximate number of tokens, 0 for an empty text
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode_ordinary(text))
+    return text.count(' ') + text.count('\n') + 1
+
 class Metrics:
     def __init__(self, total_requests=0, successful_requests=0, average_response_time=0.0, uptime=0.0):
         """
@@ -78,12 +121,15 @@ class RateLimiter:
             bool: True if request can proceed, False otherwise
         """
         now = time.time()
-        # Remove requests older than 1 minute
-        while self.requests and self.requests[0] < now - 60:
-            self.requests.popleft()
+        # Remove requests older than 1 minute; timestamps are appended in order,
+        # so only the expired ones at the left end are touched
+        cutoff = now - 60
+        requests = self.requests
+        while requests and requests[0] < cutoff:
+            requests.popleft()
         
-        if len(self.requests) < self.requests_per_minute:
-            self.requests.append(now)
+        if len(requests) < self.requests_per_minute:
+            requests.append(now)
             return True
         return False
 
@@ -1,5 +1,5 @@
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, timezone
 import json
 
 class ProgressTracker:
@@ -33,7 +33,10 @@ class ProgressTracker:
         self.total_steps = total_steps
         self.current_step = 0
         self.operation_name = operation_name
-        self.start_time = datetime.utcnow()
+        self.start_time = datetime.now(timezone.utc)
+        # Neither changes after construction, so to_dict and progress reuse them
+        self._started_at = self.start_time.isoformat()
+        self._percent_per_step = 100.0 / total_steps if total_steps > 0 else 0.0
         self.status = "in_progress"
         self.message = ""
         
@@ -90,7 +93,7 @@ class ProgressTracker:
             >>> tracker.progress
             66.66  # When 2 of 3 steps completed
         """
-        return (self.current_step / self.total_steps) * 100 if self.total_steps > 0 else 0
+        return self.current_step * self._percent_per_step
     
     def to_dict(self) -> dict:
         """
@@ -106,7 +109,7 @@ class ProgressTracker:
                 'progress': 66.66,
                 'status': 'in_progress',
                 'message': 'Processing...',
-                'started_at': '2024-01-23T10:30:00',
+                'started_at': '2024-01-23T10:30:00+00:00',
                 'current_step': 2,
                 'total_steps': 3
             }
@@ -116,7 +119,7 @@ class ProgressTracker:
             "progress": round(self.progress, 2),
             "status": self.status,
             "message": self.message,
-            "started_at": self.start_time.isoformat(),
+            "started_at": self._started_at,
             "current_step": self.current_step,
             "total_steps": self.total_steps
         }
\ No newline at end of file
@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+import uuid
+import numpy as np
+
+# The database module connects on import, so point it at a scratch database first
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/test.db")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+from src.crawlgpt.core.database import (
+    authenticate_user, create_user, delete_user_chat_history, get_vector_chunks,
+    replace_chat_history, save_missing_vector_chunks, save_vector_chunks
+)
+
+
+def make_user():
+    username = f"user_{uuid.uuid4().hex[:12]}"
+    create_user(username, "password", "user@example.com")
+    return authenticate_user(username, "password").id
+
+
+class TestVectorChunks(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up a user with two stored chunks.
+        """
+        self.user_id = make_user()
+        self.chunks = ["first chunk", "second chunk"]
+        self.summaries = ["first summary", "second summary"]
+        self.embeddings = np.random.default_rng(0).standard_normal((2, 8)).astype("float32")
+        save_vector_chunks(self.user_id, self.chunks, self.summaries, self.embeddings)
+
+    def test_round_trip(self):
+        """
+        Test that stored chunks load back verbatim and in insertion order.
+        """
+        chunks, summaries, embeddings = get_vector_chunks(self.user_id, 8)
+        self.assertEqual(chunks, self.chunks)
+        self.assertEqual(summaries, self.summaries)
+        np.testing.assert_array_equal(embeddings, self.embeddings)
+
+    def test_other_users_are_separate(self):
+        """
+        Test that a user without stored chunks gets empty results of the right shape.
+        """
+        chunks, summaries, embeddings = get_vector_chunks(make_user(), 8)
+        self.assertEqual(chunks, [])
+        self.assertEqual(summaries, [])
+        self.assertEqual(embeddings.shape, (0, 8))
+
+    def test_clearing_history_drops_chunks(self):
+        """
+        Test that deleting a user's history also deletes their stored chunks.
+        """
+        delete_user_chat_history(self.user_id)
+        self.assertEqual(get_vector_chunks(self.user_id, 8)[0], [])
+
+    def test_replacing_history_drops_chunks(self):
+        """
+        Test that replacing a user's history drops the chunks built from the old one.
+        """
+        replace_chat_history(self.user_id, [{"message": "hi", "role": "user", "context": "new"}])
+        self.assertEqual(get_vector_chunks(self.user_id, 8)[0], [])
+
+    def test_save_missing_skips_stored_chunks(self):
+        """
+        Test that only chunks the user doesn't have stored yet are inserted.
+        """
+        embeddings = np.vstack([self.embeddings, np.ones((1, 8), dtype="float32")])
+        save_missing_vector_chunks(
+            self.user_id, self.chunks + ["third chunk"], self.summaries + ["third summary"], embeddings
+        )
+        chunks, summaries, stored = get_vector_chunks(self.user_id, 8)
+        self.assertEqual(chunks, self.chunks + ["third chunk"])
+        self.assertEqual(summaries, self.summaries + ["third summary"])
+        np.testing.assert_array_equal(stored, embeddings)
+
+
+if __name__ == "__main__":
+    unittest.main()
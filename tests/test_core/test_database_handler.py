@@ -1,5 +1,6 @@
 import unittest
 import asyncio
+import numpy as np
 from unittest.mock import AsyncMock, MagicMock
 from src.crawlgpt.core.LLMBasedCrawler import Model
 from src.crawlgpt.core.DatabaseHandler import VectorDatabase
@@ -58,5 +59,37 @@ class TestIntegration(unittest.TestCase):
         asyncio.run(self.async_test_end_to_end_flow())
 
 
+class TestFromDict(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up a database and a state with two records.
+        """
+        self.database = VectorDatabase()
+        self.data = [{"text": "Chunk 1", "summary": "Summary 1"}, {"text": "Chunk 2", "summary": "Summary 2"}]
+
+    def test_restores_matching_embeddings(self):
+        """
+        Test that records with one embedding each are restored.
+        """
+        embeddings = np.ones((2, self.database.index.d), dtype="float32")
+        self.database.from_dict({"data": self.data, "index": embeddings.tolist()})
+        self.assertEqual(self.database.texts, ["Chunk 1", "Chunk 2"])
+        self.assertEqual(self.database.index.ntotal, 2)
+
+    def test_rejects_mismatched_embeddings(self):
+        """
+        Test that records without exactly one embedding of the index dimension are rejected.
+        """
+        d = self.database.index.d
+        for data, index in [
+            (self.data, []),
+            (self.data, np.ones((1, d)).tolist()),
+            (self.data, np.ones((2, d + 1)).tolist()),
+            ([], np.ones((1, d)).tolist()),
+        ]:
+            with self.assertRaises(ValueError):
+                self.database.from_dict({"data": data, "index": index})
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -1,7 +1,10 @@
 import unittest
-from unittest.mock import AsyncMock, MagicMock
-from crawlgpt.core.LLMBasedCrawler import Model
+from unittest.mock import AsyncMock, MagicMock, patch
+from src.crawlgpt.core.LLMBasedCrawler import Model
 import asyncio
+import re
+import zlib
+import numpy as np
 
 
 class TestModel(unittest.TestCase):
@@ -44,5 +47,98 @@ class TestModel(unittest.TestCase):
             asyncio.run(test_crawl())
 
 
+def fake_encode(texts):
+    """
+    Deterministic unit embeddings; queries that differ only in case or
+    punctuation get the same vector.
+    """
+    embeddings = []
+    for text in texts:
+        normalized = re.sub(r"[^a-z0-9 ]", "", text.lower()).strip()
+        vector = np.random.default_rng(zlib.crc32(normalized.encode())).standard_normal(8)
+        embeddings.append(vector / np.linalg.norm(vector))
+    return np.array(embeddings, dtype="float32")
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up a Model with a stubbed Groq client and embedding function.
+        """
+        self.model = Model()
+        self.model.database.encode = MagicMock(side_effect=fake_encode)
+        self.model.database.search_by_embedding = MagicMock(return_value=[])
+        self.model.query_index = type(self.model.query_index)(8)
+        self.model._reset_response_cache()
+        self.calls = 0
+
+        def create(**kwargs):
+            self.calls += 1
+            completion = MagicMock()
+            completion.choices[0].message.content = f"Answer {self.calls}"
+            return completion
+
+        self.model.client = MagicMock()
+        self.model.client.chat.completions.create = MagicMock(side_effect=create)
+
+    def ask(self, query, temperature=0.7, max_tokens=100):
+        return self.model.generate_response(query, temperature, max_tokens, "llama-3.1-8b-instant")
+
+    def test_exact_hit(self):
+        """
+        Test that a repeated query is answered from the cache.
+        """
+        self.assertEqual(self.ask("what is x"), "Answer 1")
+        self.assertEqual(self.ask("what is x"), "Answer 1")
+        self.assertEqual(self.calls, 1)
+
+    def test_near_duplicate_hit(self):
+        """
+        Test that a near-identical query reuses the cached response.
+        """
+        self.assertEqual(self.ask("what is x"), "Answer 1")
+        self.assertEqual(self.ask("What is X?"), "Answer 1")
+        self.assertEqual(self.calls, 1)
+
+    def test_miss_when_settings_differ(self):
+        """
+        Test that changing temperature or max_tokens generates a new response.
+        """
+        self.assertEqual(self.ask("what is x", 0.1, 100), "Answer 1")
+        self.assertEqual(self.ask("what is x", 0.9, 100), "Answer 2")
+        self.assertEqual(self.ask("What is X?", 0.1, 4000), "Answer 3")
+        self.assertEqual(self.calls, 3)
+
+    def test_reset_on_clear_and_import(self):
+        """
+        Test that clearing or importing state drops cached responses.
+        """
+        self.ask("what is x")
+        self.model.clear()
+        self.assertEqual(self.ask("what is x"), "Answer 2")
+
+        self.model.import_state({
+            "metrics": self.model.metrics_collector.metrics.to_dict(),
+            "vector_database": {"data": [], "index": []}
+        })
+        self.assertEqual(self.ask("what is x"), "Answer 3")
+        self.assertEqual(self.calls, 3)
+
+    def test_evicts_least_recently_used(self):
+        """
+        Test that the cache is capped and the semantic index is rebuilt on eviction.
+        """
+        with patch("src.crawlgpt.core.LLMBasedCrawler.RESPONSE_CACHE_SIZE", 2):
+            self.ask("first question")
+            self.ask("second question")
+            self.ask("first question")  # refreshes the first entry
+            self.ask("third question")  # evicts the second
+            self.assertEqual(self.model.query_index.ntotal, 2)
+            self.assertEqual(len(self.model.cache["responses"]), 2)
+            self.assertEqual(self.ask("first question"), "Answer 1")
+            self.assertEqual(self.ask("second question"), "Answer 4")
+            self.assertEqual(self.calls, 4)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,5 +1,7 @@
+import asyncio
 import unittest
-from crawlgpt.core.SummaryGenerator import SummaryGenerator
+from unittest.mock import AsyncMock, MagicMock
+from src.crawlgpt.core.SummaryGenerator import SummaryGenerator
 
 
 class TestSummaryGenerator(unittest.TestCase):
@@ -30,6 +32,27 @@ class TestSummaryGenerator(unittest.TestCase):
         print(f"[DEBUG] Summary for empty input: {summary}")
         self.assertEqual(summary, "")
 
+    def test_generate_summaries_preserves_order(self):
+        """
+        Test that batch summarization returns summaries in input order.
+        """
+        self.summarizer.generate_summary = MagicMock(side_effect=lambda text, model: f"Summary of {text}")
+        texts = ["short", "a much longer chunk of text", "medium text"]
+        summaries = self.summarizer.generate_summaries(texts)
+        print(f"[DEBUG] Batch summaries: {summaries}")
+        self.assertEqual(summaries, [f"Summary of {text}" for text in texts])
+
+    def test_agenerate_summaries_requests_duplicates_once(self):
+        """
+        Test that async batch summarization summarizes repeated texts only once.
+        """
+        self.summarizer.agenerate_summary = AsyncMock(side_effect=lambda text, model: f"Summary of {text}")
+        texts = ["first", "second", "first"]
+        summaries = asyncio.run(self.summarizer.agenerate_summaries(texts))
+        print(f"[DEBUG] Async batch summaries: {summaries}")
+        self.assertEqual(summaries, [f"Summary of {text}" for text in texts])
+        self.assertEqual(self.summarizer.agenerate_summary.await_count, 2)
+
 
 if __name__ == "__main__":
     unittest.main()
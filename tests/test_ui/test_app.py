@@ -0,0 +1,426 @@
+import os
+import tempfile
+import threading
+import unittest
+import uuid
+from unittest.mock import AsyncMock, MagicMock, patch
+
+# The database module connects on import, so point it at a scratch database first
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/test.db")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+from flask import jsonify
+from src.crawlgpt.core.database import get_chat_history, get_vector_chunks, save_chat_messages, save_vector_chunks
+from src.crawlgpt.ui.app import (
+    SessionCache, _cache_history, _get_cached_history, _history_generation, app,
+    flush_chat_writes, invalidate_history_cache, queue_chat_messages, user_sessions
+)
+
+
+class TestSessionCache(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up a SessionCache that holds a single session.
+        """
+        self.spill_dir = os.path.join(tempfile.mkdtemp(), "sessions")
+        self.cache = SessionCache(1, self.spill_dir, idle_ttl=60)
+
+    def load_session(self, user_id, context):
+        session = self.cache[user_id]
+        session['model'].context = context
+        session['model'].database.add_data([f"{context} chunk"], [f"{context} summary"])
+        session['url_processed'] = True
+        return session
+
+    def test_spill_and_restore(self):
+        """
+        Test that an evicted session is written to disk and loaded back intact.
+        """
+        self.load_session(1, "first")
+        self.cache[2]
+        self.assertNotIn(1, self.cache)
+        self.assertTrue(os.listdir(self.spill_dir))
+
+        restored = self.cache[1]
+        self.assertEqual(restored['model'].context, "first")
+        self.assertEqual(restored['model'].database.texts, ["first chunk"])
+        self.assertTrue(restored['url_processed'])
+        # The spilled files are consumed once loaded; user 2 had nothing to spill
+        self.assertEqual(os.listdir(self.spill_dir), [])
+
+    def test_spill_dir_created_on_first_spill(self):
+        """
+        Test that the spill directory is only created once a session is written to it.
+        """
+        self.cache[1]
+        self.cache[2]
+        self.assertFalse(os.path.exists(self.spill_dir))
+        self.load_session(2, "second")
+        self.cache[3]
+        self.assertTrue(os.listdir(self.spill_dir))
+
+    def test_session_in_use_is_not_evicted(self):
+        """
+        Test that a session held by a request survives pressure from other users.
+        """
+        with self.cache.in_use(1) as session:
+            self.cache[2]
+            self.assertIn(1, self.cache)
+            session['model'].context = "written during the request"
+        self.assertEqual(len(self.cache), 1)
+        self.assertEqual(self.cache[1]['model'].context, "written during the request")
+
+    def test_idle_sessions_are_evicted(self):
+        """
+        Test that sessions idle for longer than idle_ttl are evicted even when there is room.
+        """
+        self.cache.maxsize = 10
+        self.load_session(1, "idle")
+        self.cache[2]
+        self.cache._last_used[1] -= 120
+        self.cache[2]
+        self.assertNotIn(1, self.cache)
+        self.assertEqual(self.cache[1]['model'].context, "idle")
+
+    def lock_is_free(self):
+        """Whether another thread can take the cache lock right now."""
+        acquired = []
+
+        def probe():
+            if self.cache._lock.acquire(timeout=1):
+                acquired.append(True)
+                self.cache._lock.release()
+
+        thread = threading.Thread(target=probe)
+        thread.start()
+        thread.join()
+        return bool(acquired)
+
+    def test_idle_sessions_spill_outside_lock(self):
+        """
+        Test that idle sessions are written to disk after the cache lock is released.
+        """
+        self.cache.maxsize = 10
+        self.load_session(1, "idle")
+        self.cache[2]
+        self.cache._last_used[1] -= 120
+        lock_free = []
+        with patch.object(self.cache, "_spill", side_effect=lambda *args: lock_free.append(self.lock_is_free())):
+            self.cache[2]
+        self.assertEqual(lock_free, [True])
+
+    def test_idle_session_in_use_is_kept(self):
+        """
+        Test that the idle timeout doesn't evict a session during a long request.
+        """
+        self.cache.maxsize = 10
+        with self.cache.in_use(1):
+            self.cache._last_used[1] -= 120
+            self.cache[2]
+            self.assertIn(1, self.cache)
+
+    def slow_restore(self):
+        """Patches _restore to wait until the returned event is set."""
+        release = threading.Event()
+        restore = self.cache._restore
+
+        def slow(user_id):
+            release.wait(5)
+            return restore(user_id)
+
+        return release, patch.object(self.cache, "_restore", side_effect=slow)
+
+    def test_restore_does_not_block_other_users(self):
+        """
+        Test that loading one user's session doesn't hold up lookups for other users.
+        """
+        self.cache.maxsize = 10
+        self.cache[2]
+        release, slow = self.slow_restore()
+        with slow:
+            loader = threading.Thread(target=lambda: self.cache[1])
+            loader.start()
+            other = threading.Thread(target=lambda: self.cache[2])
+            other.start()
+            other.join(1)
+            self.assertFalse(other.is_alive())
+            release.set()
+            loader.join()
+        self.assertIn(1, self.cache)
+
+    def test_concurrent_lookups_restore_once(self):
+        """
+        Test that concurrent lookups for the same user share a single restore.
+        """
+        release, slow = self.slow_restore()
+        sessions = []
+        with slow as restore:
+            threads = [threading.Thread(target=lambda: sessions.append(self.cache[1])) for _ in range(3)]
+            for thread in threads:
+                thread.start()
+            release.set()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(restore.call_count, 1)
+        self.assertTrue(all(session is sessions[0] for session in sessions))
+
+
+class TestHistoryCache(unittest.TestCase):
+    def test_other_users_writes_dont_block_caching(self):
+        """
+        Test that another user's history changing doesn't stop a user's history being cached.
+        """
+        user_id, other_user = uuid.uuid4().hex, uuid.uuid4().hex
+        generation = _history_generation(user_id)
+        invalidate_history_cache(other_user)
+        _cache_history(user_id, b"history", generation)
+        self.assertEqual(_get_cached_history(user_id), b"history")
+
+    def test_stale_history_is_not_cached(self):
+        """
+        Test that a body built before the user's history changed is discarded.
+        """
+        user_id = uuid.uuid4().hex
+        generation = _history_generation(user_id)
+        invalidate_history_cache(user_id)
+        _cache_history(user_id, b"stale", generation)
+        self.assertIsNone(_get_cached_history(user_id))
+
+
+class ApiTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """
+        Register a fresh user and log in through the API.
+        """
+        cls.client = app.test_client()
+        credentials = {"username": f"user_{uuid.uuid4().hex[:12]}", "password": "password"}
+        cls.client.post('/api/register', json={**credentials, "email": "user@example.com"})
+        login = cls.client.post('/api/login', json=credentials).get_json()
+        cls.user_id = login['user']['id']
+        cls.headers = {'Authorization': f"Bearer {login['token']}"}
+
+    def setUp(self):
+        """
+        Start every test from an empty session with a stubbed summarizer.
+        """
+        self.client.post('/api/clear-all', headers=self.headers)
+        self.model = user_sessions[self.user_id]['model']
+        self.model.summarizer = MagicMock()
+        self.model.summarizer.agenerate_summaries = AsyncMock(
+            side_effect=lambda chunks: [f"Summary of {chunk}" for chunk in chunks]
+        )
+
+
+class TestChatWrites(ApiTestCase):
+    def turn(self, message):
+        return {"user_id": self.user_id, "message": message, "role": "user", "context": ""}
+
+    def test_failed_write_is_retried(self):
+        """
+        Test that turns from a failed insert are kept and saved on a later attempt.
+        """
+        calls = []
+
+        def flaky_save(rows):
+            calls.append(len(rows))
+            if len(calls) == 1:
+                raise RuntimeError("database unavailable")
+            save_chat_messages(rows)
+
+        with patch("src.crawlgpt.ui.app.save_chat_messages", flaky_save), \
+                patch("src.crawlgpt.ui.app.CHAT_WRITE_RETRY_DELAYS", (0,)):
+            queue_chat_messages([self.turn("kept"), self.turn("also kept")])
+            self.assertTrue(flush_chat_writes(self.user_id))
+        self.assertEqual(len(calls), 2)
+        self.assertEqual([msg.message for msg in get_chat_history(self.user_id)], ["kept", "also kept"])
+
+    def test_flush_waits_only_for_the_user(self):
+        """
+        Test that a flush returns while another user's turns are still unsaved.
+        """
+        def failing_save(rows):
+            raise RuntimeError("database unavailable")
+
+        other_user = self.user_id + 1000
+        with patch("src.crawlgpt.ui.app.save_chat_messages", failing_save), \
+                patch("src.crawlgpt.ui.app.CHAT_WRITE_RETRY_DELAYS", ()), \
+                patch("src.crawlgpt.ui.app.CHAT_WRITE_RETRY_INTERVAL", 0.1):
+            queue_chat_messages([{**self.turn("stuck"), "user_id": other_user}])
+            self.assertTrue(flush_chat_writes(self.user_id, timeout=1))
+            self.assertFalse(flush_chat_writes(other_user, timeout=0.2))
+        self.assertTrue(flush_chat_writes(other_user))
+
+
+class TestChunkPersistence(ApiTestCase):
+    def test_process_url_stores_new_chunks(self):
+        """
+        Test that a successful extraction persists the chunks it added.
+        """
+        async def extract(url, session_id="default", progress=None):
+            self.model.context += "page text"
+            self.model.database.add_data(["first chunk", "second chunk"], ["first", "second"])
+            return True, "ok"
+
+        self.model.extract_content_from_url = extract
+        response = self.client.post('/api/process-url', headers=self.headers,
+                                    json={'url': 'https://example.com'})
+        self.assertTrue(response.get_json()['success'])
+
+        chunks, summaries, embeddings = get_vector_chunks(self.user_id, self.model.database.index.d)
+        self.assertEqual(chunks, ["first chunk", "second chunk"])
+        self.assertEqual(summaries, ["first", "second"])
+        self.assertEqual(embeddings.tolist(), self.model.database.records_since(0)[2].tolist())
+
+    def test_reprocessing_after_clear_stores_chunks_again(self):
+        """
+        Test that chunks the session already holds are stored again once clearing deleted them.
+        """
+        async def extract(url, session_id="default", progress=None):
+            self.model.context += "page text"
+            self.model.database.add_data(["first chunk", "second chunk"], ["first", "second"])
+            return True, "ok"
+
+        self.model.extract_content_from_url = extract
+        dim = self.model.database.index.d
+        self.client.post('/api/process-url', headers=self.headers, json={'url': 'https://example.com'})
+        self.client.post('/api/chat/clear', headers=self.headers)
+        self.assertEqual(get_vector_chunks(self.user_id, dim)[0], [])
+
+        self.client.post('/api/process-url', headers=self.headers, json={'url': 'https://example.com'})
+        self.assertEqual(get_vector_chunks(self.user_id, dim)[0], ["first chunk", "second chunk"])
+
+        self.client.post('/api/chat/restore', headers=self.headers)
+        self.assertEqual(self.model.database.texts, ["first chunk", "second chunk"])
+        self.model.summarizer.agenerate_summaries.assert_not_awaited()
+
+    def test_restore_rebuilds_missing_chunks_once(self):
+        """
+        Test that restoring a history without stored chunks summarizes it once and persists the result.
+        """
+        save_chat_messages([{
+            "user_id": self.user_id,
+            "message": "Content from https://example.com processed",
+            "role": "system",
+            "context": "Some page text. " * 20
+        }])
+
+        self.client.post('/api/chat/restore', headers=self.headers)
+        stored = get_vector_chunks(self.user_id, self.model.database.index.d)[0]
+        self.assertTrue(stored)
+        self.assertEqual(self.model.database.texts, stored)
+
+        self.client.post('/api/chat/restore', headers=self.headers)
+        self.assertEqual(self.model.summarizer.agenerate_summaries.await_count, 1)
+        self.assertEqual(self.model.database.texts, stored)
+        self.assertEqual(get_vector_chunks(self.user_id, self.model.database.index.d)[0], stored)
+
+    def test_clear_and_import_drop_chunks(self):
+        """
+        Test that clearing or importing history drops the stored chunks.
+        """
+        dim = self.model.database.index.d
+        save_vector_chunks(self.user_id, ["chunk"], ["summary"], self.model.database.encode(["chunk"]))
+        self.client.post('/api/chat/clear', headers=self.headers)
+        self.assertEqual(get_vector_chunks(self.user_id, dim)[0], [])
+
+        save_vector_chunks(self.user_id, ["chunk"], ["summary"], self.model.database.encode(["chunk"]))
+        exported = self.client.get('/api/export', headers=self.headers).get_json()['data']
+        response = self.client.post('/api/import', headers=self.headers, json={'data': exported})
+        self.assertTrue(response.get_json()['success'])
+        self.assertEqual(get_vector_chunks(self.user_id, dim)[0], [])
+
+
+class TestImport(ApiTestCase):
+    def test_non_object_body_is_rejected(self):
+        """
+        Test that a JSON body that isn't an object gets the "No data provided" response.
+        """
+        for body in ([1, 2], "data", 3, None):
+            response = self.client.post('/api/import', headers=self.headers, json=body)
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.get_json()['message'], 'No data provided')
+
+
+class TestExport(ApiTestCase):
+    METRICS = {
+        "total_requests": 3,
+        "successful_requests": 2,
+        "average_response_time": 0.5,
+        "uptime": 12.0
+    }
+
+    def setUp(self):
+        """
+        Pin the session metrics so the export and the expected document match.
+        """
+        super().setUp()
+        user_sessions[self.user_id]['metrics'].metrics = MagicMock(
+            to_dict=MagicMock(return_value=self.METRICS)
+        )
+
+    def expected_body(self):
+        """
+        The export as a single jsonify call over the same data would produce it.
+        """
+        messages = [{
+            "role": msg.role,
+            "content": msg.message,
+            "context": msg.context,
+            "timestamp": msg.timestamp
+        } for msg in get_chat_history(self.user_id)]
+        with app.test_request_context():
+            return jsonify({'success': True, 'data': {
+                "metrics": self.METRICS,
+                "vector_database": self.model.database.to_dict(),
+                "messages": messages
+            }}).get_data()
+
+    def fill(self):
+        save_chat_messages([{
+            "user_id": self.user_id,
+            "message": f"Message {i}",
+            "role": "user" if i % 2 else "assistant",
+            "context": "page text"
+        } for i in range(5)])
+        self.model.database.add_data(
+            [f"chunk {i}" for i in range(3)], [f"summary {i}" for i in range(3)]
+        )
+
+    def test_empty_export_matches_jsonify(self):
+        """
+        Test the streamed export with no history and an empty database.
+        """
+        body = self.client.get('/api/export', headers=self.headers).get_data()
+        self.assertEqual(body, self.expected_body())
+
+    def test_export_matches_jsonify(self):
+        """
+        Test that batches split across the stream still join into the jsonify document.
+        """
+        self.fill()
+        with patch("src.crawlgpt.ui.app.EXPORT_BATCH_SIZE", 2):
+            body = self.client.get('/api/export', headers=self.headers).get_data()
+        self.assertEqual(body, self.expected_body())
+
+    def test_export_imports_back(self):
+        """
+        Test that an export can be imported again through the API.
+        """
+        self.fill()
+        exported = self.client.get('/api/export', headers=self.headers).get_json()['data']
+        texts = list(self.model.database.texts)
+
+        self.client.post('/api/clear-all', headers=self.headers)
+        response = self.client.post('/api/import', headers=self.headers, json={'data': exported})
+        self.assertTrue(response.get_json()['success'])
+
+        model = user_sessions[self.user_id]['model']
+        self.assertEqual(model.database.texts, texts)
+        self.assertEqual(model.database.index.ntotal, len(texts))
+        history = self.client.get('/api/chat/history', headers=self.headers).get_json()['messages']
+        self.assertEqual([msg['content'] for msg in history], [f"Message {i}" for i in range(5)])
+
+
+if __name__ == "__main__":
+    unittest.main()